@@ -17,16 +17,21 @@
 # Website: https://github.com/friendlyanon/cmake-init
 
 import os
-import zipfile
+import sys
 
-from cmake_init import main
-from template import compile_template
+from cmake_init import main, needs_archive
 
 if __name__ == "__main__":
-    zip = zipfile.ZipFile(os.path.dirname(__file__), "r")
     try:
-        # open a dummy fd to keep the zip from being closed
-        with zip.open("__main__.py") as dummy_fp:
-            main(zip, compile_template)
+        if needs_archive(sys.argv[1:]):
+            import zipfile
+            from template import compile_template
+
+            zip = zipfile.ZipFile(os.path.dirname(__file__), "r")
+            # open a dummy fd to keep the zip from being closed
+            with zip.open("__main__.py") as dummy_fp:
+                main(zip, compile_template)
+        else:
+            main(None, None)
     except KeyboardInterrupt:
         pass
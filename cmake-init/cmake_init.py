@@ -22,19 +22,21 @@ FetchContent ready, separate consumer and developer targets, provide install
 rules with proper relocatable CMake packages and use modern CMake (3.14+)
 """
 
-import argparse
+# Modules that only some commands need are imported where they are used, so
+# every invocation does not pay for them at startup, see tools/importtime.py
 import contextlib
 import io
+import marshal
 import os
-import platform
 import re
-import subprocess
 import sys
-import zipfile
+import time
 
 __version__ = "0.41.1"
 
-compile_template = None
+generator = None
+
+timings = None
 
 
 class Language:
@@ -61,22 +63,110 @@ class ArgumentError(Exception):
     pass
 
 
+class Timings:
+    """Spans of time spent in the phases of generating projects and on each
+    file, for the --timings report and Chrome trace profiles
+    """
+
+    def __init__(self):
+        import threading
+
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.root = None
+        self.get_ident = threading.get_ident
+
+    def add(self, category, name, start, duration):
+        self.spans.append(
+            (category, name, start, duration, self.get_ident())
+        )
+
+    @contextlib.contextmanager
+    def span(self, category, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(category, name, start, time.perf_counter() - start)
+
+    def report(self, top=10):
+        phases = {}
+        files = {}
+        for category, name, _, duration, _ in self.spans:
+            if category == "phase":
+                phases[name] = phases.get(name, 0) + duration
+            else:
+                if self.root is not None:
+                    name = os.path.relpath(name, self.root)
+                file = files.setdefault(name, {})
+                file[category] = file.get(category, 0) + duration
+        print("\nPhase                           Time (ms)", file=sys.stderr)
+        for name, duration in phases.items():
+            print(f"{name:<30} {duration * 1000:>10.2f}", file=sys.stderr)
+        total = time.perf_counter() - self.origin
+        print(f"{'total':<30} {total * 1000:>10.2f}", file=sys.stderr)
+        slowest = sorted(
+            files.items(),
+            key=lambda item: sum(item[1].values()),
+            reverse=True,
+        )
+        print(f"\nSlowest {top} files (ms)", file=sys.stderr)
+        for name, categories in slowest[:top]:
+            details = ", ".join(
+                f"{category} {duration * 1000:.2f}"
+                for category, duration in categories.items()
+            )
+            total = sum(categories.values()) * 1000
+            print(f"{total:>10.2f}  {name} ({details})", file=sys.stderr)
+
+    def write_trace(self, path):
+        import json
+
+        events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - self.origin) * 1000000,
+                "dur": duration * 1000000,
+                "pid": os.getpid(),
+                "tid": tid,
+            }
+            for category, name, start, duration, tid in self.spans
+        ]
+        with open(path, "w", encoding="UTF-8") as f:
+            json.dump({"traceEvents": events}, f)
+
+
+def timed(category, name):
+    if timings is None:
+        return contextlib.nullcontext()
+    return timings.span(category, name)
+
+
 def prompt(msg, default, mapper=None, predicate=not_empty, header=None, no_prompt=False):
+    if no_prompt:
+        # noinspection PyBroadException
+        try:
+            value = mapper(default) if mapper is not None else default
+            if predicate(value):
+                return value
+        except Exception:
+            pass
+        raise ArgumentError(f"'{default}' is not an acceptable value")
     if header is not None:
         print(header)
     while True:
         # noinspection PyBroadException
         try:
             print(msg.format(default), end=": ")
-            in_value = ("" if no_prompt else input()) or default
+            in_value = input() or default
             value = mapper(in_value) if mapper is not None else in_value
             if predicate(value):
                 print()
                 return value
         except Exception:
             pass
-        if no_prompt:
-            raise ArgumentError(f"'{in_value}' is not an acceptable value")
         print("Invalid value, try again")
 
 
@@ -91,11 +181,17 @@ def is_semver(version):
     return re.match(r"^\d+(\.\d+){0,3}", version) is not None
 
 
+def generator_id(value):
+    value = value.lower().replace(" ", "-")
+    if value in ["ninja-multi", "ninja-multi-config"]:
+        return "m"
+    return value[0:1]
+
+
 def get_substitutes(cli_args, name):
     no_prompt = cli_args.flags_used
     if no_prompt and not is_valid_name(name):
-        print(f"'{name}' is not a valid name", file=sys.stderr)
-        exit(1)
+        raise ArgumentError(f"'{name}' is not a valid name")
 
     def ask(*args, **kwargs):
         return prompt(*args, **kwargs, no_prompt=no_prompt)
@@ -107,9 +203,9 @@ def get_substitutes(cli_args, name):
     }
     lang = c_lang if cli_args.c else cpp_lang
     os_map = {
-        "Windows": "win64",
-        "Linux": "linux",
-        "Darwin": "darwin",
+        "win32": "win64",
+        "linux": "linux",
+        "darwin": "darwin",
     }
 
     if not no_prompt:
@@ -124,14 +220,20 @@ def get_substitutes(cli_args, name):
         ),
         "version": ask(
             "Project version ({})",
-            "0.1.0",
+            cli_args.project_version or "0.1.0",
             predicate=is_semver,
             header="""\
 Use Semantic Versioning, because CMake naturally supports that. Visit
 https://semver.org/ for more information."""
         ),
-        "description": ask(*(["Short description"] * 2)),
-        "homepage": ask("Homepage URL ({})", "https://example.com/"),
+        "description": ask(
+            "Short description",
+            cli_args.description or "Short description",
+        ),
+        "homepage": ask(
+            "Homepage URL ({})",
+            cli_args.homepage or "https://example.com/",
+        ),
         "std": ask(
             "{} standard ({})".format(lang, "/".join(lang.options)),
             cli_args.std or lang.default,
@@ -151,39 +253,61 @@ up to hide every symbol by default (as it should) and use an export header to
 explicitly mark symbols for export/import, but only when built as a shared
 library."""
         ),
-        "use_clang_tidy": ask(
-            "Add clang-tidy to local dev preset ([Y]es/[n]o)",
-            cli_args.use_clang_tidy or "y",
-            mapper=lambda v: v[0:1].lower(),
-            predicate=lambda v: v in ["y", "n"],
-            header="This will require you to download clang-tidy locally.",
-        ) == "y",
-        "use_cppcheck": ask(
-            "Add cppcheck to local dev preset ([Y]es/[n]o)",
-            cli_args.use_cppcheck or "y",
-            mapper=lambda v: v[0:1].lower(),
-            predicate=lambda v: v in ["y", "n"],
-            header="This will require you to download cppcheck locally.",
-        ) == "y",
+        "use_clang_tidy": False,
+        "use_cppcheck": False,
         "examples": False,
         "c_examples": False,
         "cpp_examples": False,
-        "os": os_map.get(platform.system(), "unknown"),
+        "benchmarks": False,
+        "os": os_map.get(sys.platform, "unknown"),
         "c": cli_args.c,
         "cpp": not cli_args.c,
         "c_header": False,
         "include_source": False,
         "has_source": True,
-        "cpus": os.cpu_count(),
         "pm_name": "",
         "catch3": False,
         "cpp_std": "",
+        "benchmark_std": "",
         "msvc_cpp_std": "",
         "c90": False,
         "c99": False,
         "cmake_321": False,
+        "cmake_minor": "14",
         "modules": False,
+        "module_name": "",
+        "pgo": False,
+        "time_trace": False,
+        "fast_link": False,
+        "test_report": False,
+        "llvm_cov": False,
     }
+    if d["cpp"] and d["std"] == "20" and d["type_id"] == "s":
+        d["modules"] = "y" == ask(
+            "Use C++20 modules ([y]es/[N]o)",
+            cli_args.modules or "n",
+            mapper=lambda v: v[0:1].lower(),
+            predicate=lambda v: v in ["y", "n"],
+            header="""\
+The library will be a named module instead of a header and a source file. This
+requires CMake 3.28, Ninja or Visual Studio 2022 and GCC 14, Clang 17 or MSVC
+to build. clang-tidy and cppcheck cannot analyze modules yet.""",
+        )
+    if not d["modules"]:
+        d["use_clang_tidy"] = "y" == ask(
+            "Add clang-tidy to local dev preset ([Y]es/[n]o)",
+            cli_args.use_clang_tidy or "y",
+            mapper=lambda v: v[0:1].lower(),
+            predicate=lambda v: v in ["y", "n"],
+            header="This will require you to download clang-tidy locally.",
+        )
+        d["use_cppcheck"] = "y" == ask(
+            "Add cppcheck to local dev preset ([Y]es/[n]o)",
+            cli_args.use_cppcheck or "y",
+            mapper=lambda v: v[0:1].lower(),
+            predicate=lambda v: v in ["y", "n"],
+            header="This will require you to download cppcheck locally.",
+        )
     package_manager = ask(
         "Package manager to use ([N]one/[c]onan/[v]cpkg)",
         cli_args.package_manager or "n",
@@ -198,7 +322,83 @@ VCPKG_ROOT environment variable to be setup to vcpkg's root directory.""",
     d["pm"] = package_manager != "n"
     if d["pm"]:
         d["pm_name"] = "conan" if d["conan"] else "vcpkg"
+    compiler_cache = ask(
+        "Compiler cache to use ([N]one/[c]cache/[s]ccache)",
+        cli_args.compiler_cache or "n",
+        mapper=lambda v: v[0:1].lower(),
+        predicate=lambda v: v in ["n", "c", "s"],
+        header="""\
+A compiler cache makes rebuilds with unchanged sources almost free. It will be
+used by the Linux presets and in CI, and has to be installed locally.""",
+    )
+    d["ccache"] = compiler_cache == "c"
+    d["sccache"] = compiler_cache == "s"
+    d["compiler_cache"] = ""
+    if compiler_cache != "n":
+        d["compiler_cache"] = "ccache" if d["ccache"] else "sccache"
+    generators = ["n", "m"] if d["modules"] else ["d", "n", "m"]
+    generator = ask(
+        "Generator to use ({}/Ninja [m]ulti-Config)".format(
+            "[N]inja" if d["modules"] else "[D]efault/[n]inja"
+        ),
+        cli_args.generator or generators[0],
+        mapper=generator_id,
+        predicate=lambda v: v in generators,
+        header="""\
+The default generators are Unix Makefiles on Linux and Xcode on macOS. Ninja is
+faster, especially for incremental and no-op builds, and has to be installed
+locally. Modules can only be built with Ninja on Linux and macOS.""",
+    )
+    generator_map = {"d": "", "n": "Ninja", "m": "Ninja Multi-Config"}
+    d["generator"] = generator_map[generator]
+    d["ninja"] = generator != "d"
+    d["ninja_multi"] = generator == "m"
     d["uc_name"] = d["name"].upper().replace("-", "_")
+    d["pgo"] = "y" == ask(
+        "Add profile-guided optimization presets ([y]es/[N]o)",
+        cli_args.pgo or "n",
+        mapper=lambda v: v[0:1].lower(),
+        predicate=lambda v: v in ["y", "n"],
+        header="""\
+The pgo-instrument and pgo-use presets build the project with GCC or Clang on
+Linux in two stages, optimizing it with the profiles of a training workload.""",
+    )
+    d["time_trace"] = "y" == ask(
+        "Add compile-time profiling presets ([y]es/[N]o)",
+        cli_args.time_trace or "n",
+        mapper=lambda v: v[0:1].lower(),
+        predicate=lambda v: v in ["y", "n"],
+        header="""\
+The time-trace preset makes the compiler report where it spends the time, and
+the build-profile target summarizes the traces of Clang.""",
+    )
+    d["fast_link"] = "y" == ask(
+        "Add fast linking presets ([y]es/[N]o)",
+        cli_args.fast_link or "n",
+        mapper=lambda v: v[0:1].lower(),
+        predicate=lambda v: v in ["y", "n"],
+        header="""\
+The fast-link preset links with mold or lld and splits the debug info on Linux
+to speed up incremental builds.""",
+    )
+    d["test_report"] = "y" == ask(
+        "Add test timing reports ([y]es/[N]o)",
+        cli_args.test_report or "n",
+        mapper=lambda v: v[0:1].lower(),
+        predicate=lambda v: v in ["y", "n"],
+        header="""\
+The test-report target reports the slowest tests and the ones that got slower
+than a baseline, and CI keeps the test durations to schedule the longest first.""",
+    )
+    d["llvm_cov"] = "y" == ask(
+        "Use Clang's source-based coverage in CI ([y]es/[N]o)",
+        cli_args.llvm_cov or "n",
+        mapper=lambda v: v[0:1].lower(),
+        predicate=lambda v: v in ["y", "n"],
+        header="""\
+The coverage-llvm preset builds with Clang and processes the coverage data with
+llvm-profdata and llvm-cov, which is faster than gcovr on the data of GCC.""",
+    )
     if d["type_id"] != "e":
         key = "c_examples" if cli_args.c else "cpp_examples"
         value = "n" == ask(
@@ -209,6 +409,12 @@ VCPKG_ROOT environment variable to be setup to vcpkg's root directory.""",
         )
         d[key] = value
         d["examples"] = value
+        d["benchmarks"] = "n" == ask(
+            "Exclude benchmarks ([Y]es/[n]o)",
+            cli_args.benchmarks or "y",
+            mapper=lambda v: v[0:1].lower(),
+            predicate=lambda v: v in ["y", "n"],
+        )
     if d["type_id"] == "e":
         d["include_source"] = True
     if d["type_id"] == "h":
@@ -218,6 +424,9 @@ VCPKG_ROOT environment variable to be setup to vcpkg's root directory.""",
     d["lib"] = d["type_id"] == "s"
     d["header"] = d["type_id"] == "h"
     d["catch3"] = d["cpp"] and d["std"] != "11" and d["pm"]
+    if d["benchmarks"] and d["pm"]:
+        # Google Benchmark requires C++14
+        d["benchmark_std"] = "14" if d["c"] or d["std"] == "11" else d["std"]
     if d["conan"]:
         if d["c"]:
             d["cpp_std"] = "11"
@@ -230,11 +439,13 @@ VCPKG_ROOT environment variable to be setup to vcpkg's root directory.""",
             d["c90"] = True
         else:
             d["c99"] = True
-    else:
-        if d["std"] == "20":
-            d["modules"] = True
     if d["c"] and int(d["std"]) >= 17:
         d["cmake_321"] = True
+        d["cmake_minor"] = "21"
+    if d["modules"]:
+        d["cmake_321"] = True
+        d["cmake_minor"] = "28"
+        d["module_name"] = d["name"].replace("-", "_")
     return d
 
 
@@ -242,108 +453,685 @@ def mkdir(path):
     os.makedirs(path, exist_ok=True)
 
 
-def write_file(path, d, overwrite, zip_path):
-    if overwrite or not os.path.exists(path):
-        renderer = compile_template(zip_path.read_text(encoding="UTF-8"), d)
-        # noinspection PyBroadException
+def user_cache_dir():
+    path = os.environ.get("CMAKE_INIT_CACHE_DIR")
+    if path is not None:
+        return path or None
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") \
+            or os.path.expanduser("~/.cache")
+    return os.path.join(base, "cmake-init")
+
+
+def template_cache_name():
+    return f"templates-{__version__}-{sys.implementation.cache_tag}.cache"
+
+
+def read_template_cache(path):
+    # noinspection PyBroadException
+    try:
+        with open(path, "rb") as f:
+            version, cache_tag, entries = marshal.load(f)
+    except Exception:
+        return {}
+    if version != __version__ or cache_tag != sys.implementation.cache_tag:
+        return {}
+    return entries
+
+
+class TemplateCache:
+    """Marshalled code of compiled templates, keyed by the CRC and size of the
+    archive member they were compiled from. Entries are read from the prebuilt
+    cache next to the archive first, then from the user cache, which is the
+    only one ever written to.
+    """
+
+    def __init__(self, zip, path, prebuilt_path=None):
+        self.zip = zip
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        for p in [prebuilt_path, path]:
+            if p is not None:
+                self.entries.update(read_template_cache(p))
+
+    def get(self, name):
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        info = self.zip.getinfo(name)
+        if entry[0] != info.CRC or entry[1] != info.file_size:
+            return None
+        return marshal.loads(entry[2])
+
+    def put(self, name, code):
+        info = self.zip.getinfo(name)
+        self.entries[name] = (info.CRC, info.file_size, marshal.dumps(code))
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty or self.path is None:
+            return
+        names = set(self.zip.namelist())
+        entries = {k: v for k, v in self.entries.items() if k in names}
+        directory, file_name = os.path.split(self.path)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        data = (__version__, sys.implementation.cache_tag, entries)
         try:
-            contents = renderer()
-        except Exception:
-            print(f"Error while rendering {path}", file=sys.stderr)
-            raise
-        with open(path, "w", encoding="UTF-8", newline="\n") as f:
-            f.write(contents)
-
-
-def should_install_file(name, d):
-    if name == "project-is-top-level.cmake":
-        return not d["cmake_321"]
-    if name == "vcpkg.json":
-        return d["vcpkg"]
-    if name == "conanfile.py":
-        return d["conan"]
-    if name == "install-config.cmake":
-        return not d["exe"]
-    if name == "windows-set-path.cmake":
-        return not d["pm"]
-    if name == "header_impl.c":
-        return d["c_header"] and d["pm"]
-    if name == "env.ps1" or name == "env.bat":
-        return d["lib"] and not d["pm"]
-    return True
+            mkdir(directory)
+            with open(temp_path, "wb") as f:
+                marshal.dump(data, f)
+            os.replace(temp_path, self.path)
+            # Only the caches of other versions for this interpreter are stale,
+            # other interpreters may still be using theirs
+            suffix = f"-{sys.implementation.cache_tag}.cache"
+            for name in os.listdir(directory):
+                if name != file_name and name.startswith("templates-") \
+                        and name.endswith(suffix):
+                    os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+        self.dirty = False
+
+
+def open_template_cache(zip):
+    cache_dir = user_cache_dir()
+    name = template_cache_name()
+    path = None if cache_dir is None else os.path.join(cache_dir, name)
+    prebuilt_path = None
+    if zip.filename is not None:
+        prebuilt_path = os.path.join(os.path.dirname(zip.filename), name)
+    return TemplateCache(zip, path, prebuilt_path)
 
 
-def should_install_dir(at, d):
+def build_template_cache(zip, template_compiler, directory):
+    """Compile every template in the archive and store the result in the
+    directory, which should be the one the archive will be installed to
+    """
+    cache = TemplateCache(zip, os.path.join(directory, template_cache_name()))
+    for name in zip.namelist():
+        # Files directly in templates/ are not templates, e.g. the LICENSE
+        if name.endswith("/") or os.path.dirname(name) == "templates":
+            continue
+        source = zip.read(name).decode("UTF-8")
+        cache.put(name, template_compiler(source, name).code)
+    cache.save()
+
+
+def is_executable(path):
+    return path.endswith(".sh")
+
+
+def file_opener(path, flags):
+    return os.open(path, flags, 0o777 if is_executable(path) else 0o666)
+
+
+def write_file(path, contents):
+    with timed("write", path), open(
+            path,
+            "w",
+            encoding="UTF-8",
+            newline="\n",
+            opener=file_opener,
+    ) as f:
+        f.write(contents)
+
+
+template_roots = [
+    f"{language}{kind}/"
+    for language in ["", "c/"]
+    for kind in ["common", "executable", "header", "shared"]
+]
+
+file_predicates = {
+    "project-is-top-level.cmake": lambda d: not d["cmake_321"],
+    "vcpkg.json": lambda d: d["vcpkg"],
+    "conanfile.py": lambda d: d["conan"],
+    "install-config.cmake": lambda d: not d["exe"],
+    "windows-set-path.cmake": lambda d: not d["pm"],
+    "header_impl.c": lambda d: d["c_header"] and d["pm"],
+    "pch.hpp": lambda d: not d["c"] and not d["header"],
+    "pch.h": lambda d: not d["header"],
+    "pgo.cmake": lambda d: d["pgo"],
+    "build-profile.cmake": lambda d: d["time_trace"],
+    "fast-link.cmake": lambda d: d["fast_link"],
+    "test-report.cmake": lambda d: d["test_report"],
+    "test-report-targets.cmake": lambda d: d["test_report"],
+    "llvm-cov-trace.cmake": lambda d: d["llvm_cov"],
+    "__name__.hpp": lambda d: not d["modules"],
+    "__name__.cppm": lambda d: d["modules"],
+    "env.ps1": lambda d: d["lib"] and not d["pm"],
+    "env.bat": lambda d: d["lib"] and not d["pm"],
+}
+
+
+def dir_predicate(at):
     if at.endswith("/example/"):
-        if d["c"]:
-            return d["c_examples"] if "/c/" in at else False
-        else:
-            return d["cpp_examples"]
+        if "/c/" in at:
+            return lambda d: d["c"] and d["c_examples"]
+        return lambda d: not d["c"] and d["cpp_examples"]
+    if at.endswith("/benchmark/"):
+        return lambda d: d["benchmarks"]
     if at.endswith("/scripts/"):
-        return d["conan"]
-    return True
+        return lambda d: d["conan"]
+    return None
+
+
+def build_manifest(zip):
+    """Index the files of every template root in the archive along with the
+    predicates deciding whether they are installed, so a project's files can be
+    planned in a single pass without walking the archive
+    """
+    result = {root: [] for root in template_roots}
+    dir_predicates = {}
+    for member in zip.namelist():
+        if member.endswith("/"):
+            continue
+        root = next(
+            (r for r in template_roots if member.startswith(f"templates/{r}")),
+            None,
+        )
+        if root is None:
+            continue
+        relative_path = member[len(f"templates/{root}"):]
+        predicates = []
+        at = f"templates/{root}"
+        for part in relative_path.split("/")[:-1]:
+            at = f"{at}{part}/"
+            if at not in dir_predicates:
+                dir_predicates[at] = dir_predicate(at)
+            if dir_predicates[at] is not None:
+                predicates.append(dir_predicates[at])
+        file_predicate = file_predicates.get(os.path.basename(member))
+        if file_predicate is not None:
+            predicates.append(file_predicate)
+        result[root].append((relative_path, member, tuple(predicates)))
+    return result
 
 
 def transform_path(path, d):
-    if d["c"] and d["pm"] and path.endswith("_test.c"):
+    if d["c"] and d["pm"] and path.endswith(("_test.c", "_benchmark.c")):
         return f"{path}pp"
     return path
 
 
-def write_dir(path, d, overwrite, zip_path):
-    for entry in zip_path.iterdir():
-        name = entry.name.replace("__name__", d["name"])
-        next_path = os.path.join(path, name)
-        if entry.is_file():
-            if should_install_file(name, d):
-                write_file(transform_path(next_path, d), d, overwrite, entry)
-        elif should_install_dir(entry.at, d):
-            mkdir(next_path)
-            write_dir(next_path, d, overwrite, entry)
+def plan_project(d, manifest):
+    """Resolve the template roots of the project to a mapping of output paths
+    relative to the project root to the archive member they are rendered from,
+    files in earlier roots overriding the ones in later roots
+    """
+    mapping = {"e": "executable/", "h": "header/", "s": "shared/"}
+    roots = [("c/" if d["c"] else "") + mapping[d["type_id"]], "common/"]
+    if d["c"]:
+        roots.insert(1, "c/common/")
+    plan = {}
+    for root in roots:
+        for relative_path, member, predicates in manifest[root]:
+            if all(predicate(d) for predicate in predicates):
+                name = relative_path.replace("__name__", d["name"])
+                plan.setdefault(transform_path(name, d), member)
+    return plan
+
+
+def render_project(path, d, generator, plan):
+    """Render every file of the plan to memory, reporting every file that
+    failed to render before raising the first error
+    """
+    files = {}
+    errors = []
+    for name, member in plan.items():
+        next_path = os.path.join(path, *name.split("/"))
+        # noinspection PyBroadException
+        try:
+            with timed("compile", next_path):
+                template = generator.get_template(member)
+            with timed("render", next_path):
+                files[next_path] = template.render(d)
+        except Exception as e:
+            print(f"Error while rendering {next_path}", file=sys.stderr)
+            errors.append(e)
+    if len(errors) != 0:
+        raise errors[0]
+    return files
+
+
+max_write_workers = 8
+
+
+def write_files(files, serial=False):
+    import concurrent.futures
+
+    for directory in sorted({os.path.dirname(p) for p in files}):
+        mkdir(directory)
+    if serial:
+        for next_path, contents in files.items():
+            write_file(next_path, contents)
+        return
+    errors = []
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(max_write_workers, len(files) or 1),
+    ) as executor:
+        futures = {
+            next_path: executor.submit(write_file, next_path, contents)
+            for next_path, contents in files.items()
+        }
+    for next_path, future in futures.items():
+        error = future.exception()
+        if error is not None:
+            print(f"Error while writing {next_path}", file=sys.stderr)
+            errors.append(error)
+    if len(errors) != 0:
+        raise errors[0]
+
+
+def write_project(path, d, generator, plan, serial=False):
+    with timed("phase", "render"):
+        files = render_project(path, d, generator, plan)
+    with timed("phase", "write"):
+        write_files(files, serial)
+    return files
+
+
+def archive_epoch():
+    """Timestamp of every entry in archives, so the same project always
+    results in the same archive. SOURCE_DATE_EPOCH is honoured, but nothing
+    earlier than 1980, which is the earliest date zip files can represent.
+    """
+    try:
+        epoch = int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    except ValueError:
+        epoch = 0
+    return max(epoch, 315532800)
+
+
+def archive_directories(names):
+    directories = set()
+    for name in names:
+        name = os.path.dirname(name)
+        while name != "" and name not in directories:
+            directories.add(name)
+            name = os.path.dirname(name)
+    return sorted(directories)
+
+
+def write_zip(f, files, epoch):
+    import zipfile
+
+    date_time = time.gmtime(epoch)[:6]
+    with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name in archive_directories(files):
+            info = zipfile.ZipInfo(f"{name}/", date_time)
+            info.external_attr = (0o40755 << 16) | 0x10
+            archive.writestr(info, b"")
+        for name, data in sorted(files.items()):
+            info = zipfile.ZipInfo(name, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            mode = 0o755 if is_executable(name) else 0o644
+            info.external_attr = (0o100000 | mode) << 16
+            archive.writestr(info, data)
+
+
+def write_tar(f, files, epoch):
+    import tarfile
+
+    with tarfile.open(fileobj=f, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for name in archive_directories(files):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            info.mtime = epoch
+            tar.addfile(info)
+        for name, data in sorted(files.items()):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755 if is_executable(name) else 0o644
+            info.mtime = epoch
+            tar.addfile(info, io.BytesIO(data))
+
+
+def get_compressor(compression, epoch):
+    if compression == "gz":
+        import gzip
+
+        # The name and time in the gzip header are fixed as well
+        return lambda f: gzip.GzipFile("", "wb", 9, f, epoch)
+    if compression == "xz":
+        import lzma
+
+        return lambda f: lzma.LZMAFile(f, "wb")
+    if compression == "zst":
+        try:
+            # Only available since Python 3.14
+            from compression import zstd
+        except ImportError:
+            raise ArgumentError("This Python does not support zstd")
+        return lambda f: zstd.ZstdFile(f, "wb")
+    return None
+
+
+archive_formats = {
+    ".zip": None,
+    ".tar": None,
+    ".tar.gz": "gz",
+    ".tgz": "gz",
+    ".tar.xz": "xz",
+    ".txz": "xz",
+    ".tar.zst": "zst",
+    ".tzst": "zst",
+}
+
+
+def write_archive(archive_path, files):
+    """Write the files to an archive whose format is determined by the file
+    extension, or as an uncompressed tar to stdout if the path is "-"
+    """
+    suffix = ".tar"
+    if archive_path != "-":
+        lower_path = archive_path.lower()
+        suffix = next(
+            (x for x in archive_formats if lower_path.endswith(x)),
+            None,
+        )
+        if suffix is None:
+            formats = ", ".join(archive_formats)
+            raise ArgumentError(f"Unknown archive format, use: {formats}")
+    epoch = archive_epoch()
+    compressor = get_compressor(archive_formats[suffix], epoch)
+    files = {
+        name.replace(os.sep, "/"): contents.encode("UTF-8")
+        for name, contents in files.items()
+    }
+    with contextlib.ExitStack() as stack:
+        if archive_path == "-":
+            f = sys.stdout.buffer
+        else:
+            f = stack.enter_context(open(archive_path, "wb"))
+        if compressor is not None:
+            f = stack.enter_context(compressor(f))
+        if suffix == ".zip":
+            write_zip(f, files, epoch)
+        else:
+            write_tar(f, files, epoch)
 
 
-def determine_git_version():
-    search_pattern = r"\d+(\.\d+)+"
-    git_version_out = \
-        subprocess.run("git --version", shell=True, capture_output=True)
-    if git_version_out.returncode != 0:
+def read_file(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
         return None
-    git_version_out = str(git_version_out.stdout, sys.stdout.encoding)
-    git_version_match = re.search(search_pattern, git_version_out)
-    if not git_version_match:
+
+
+def update_project(path, d, generator, plan, serial=False, dry_run=False):
+    """Write only the files whose rendered contents differ from the ones on
+    disk, so the unchanged files keep their modification time
+    """
+    files = render_project(path, d, generator, plan)
+    changed = {}
+    for next_path, contents in files.items():
+        current = read_file(next_path)
+        if current != contents.encode("UTF-8"):
+            changed[next_path] = contents
+            status = "Created" if current is None else "Updated"
+            print(f"{status} {os.path.relpath(next_path, path)}")
+    if not dry_run:
+        write_files(changed, serial)
+    print(f"{len(files) - len(changed)} files were already up to date")
+
+
+git_config = """\
+[core]
+\trepositoryformatversion = 0
+\tfilemode = {filemode}
+\tbare = false
+\tlogallrefupdates = true{extra}
+"""
+
+
+def git_object(git_dir, kind, data):
+    """Store a loose object in the repository and return its binary SHA-1
+    """
+    import hashlib
+    import zlib
+
+    data = f"{kind} {len(data)}\0".encode() + data
+    sha = hashlib.sha1(data)
+    name = sha.hexdigest()
+    directory = os.path.join(git_dir, "objects", name[:2])
+    mkdir(directory)
+    with open(os.path.join(directory, name[2:]), "wb") as f:
+        f.write(zlib.compress(data))
+    return sha.digest()
+
+
+def git_tree(git_dir, tree):
+    entries = []
+    for name, value in tree.items():
+        if isinstance(value, dict):
+            sha = git_tree(git_dir, value)
+            # Trees are sorted as if their names ended with a slash
+            entries.append((f"{name}/".encode(), b"40000", name, sha))
+        else:
+            mode, sha = value
+            entries.append((name.encode(), b"%o" % mode, name, sha))
+    entries.sort(key=lambda entry: entry[0])
+    data = b"".join(
+        mode + b" " + name.encode() + b"\0" + sha
+        for _, mode, name, sha in entries
+    )
+    return git_object(git_dir, "tree", data)
+
+
+def git_index(git_dir, entries):
+    """Write a version 2 index for the committed files, so git does not see
+    them as deleted and untracked at the same time
+    """
+    import hashlib
+    import struct
+
+    data = [b"DIRC", struct.pack(">II", 2, len(entries))]
+    for name, (mode, sha, st) in sorted(entries.items()):
+        name = name.encode()
+        fields = [
+            int(st.st_ctime), st.st_ctime_ns % 1000000000,
+            int(st.st_mtime), st.st_mtime_ns % 1000000000,
+            st.st_dev, st.st_ino, mode, st.st_uid, st.st_gid, st.st_size,
+        ]
+        data.append(struct.pack(
+            ">10I20sH",
+            *[field & 0xFFFFFFFF for field in fields],
+            sha,
+            min(len(name), 0xFFF),
+        ))
+        data.append(name + b"\0" * (8 - (62 + len(name)) % 8))
+    data = b"".join(data)
+    with open(os.path.join(git_dir, "index"), "wb") as f:
+        f.write(data + hashlib.sha1(data).digest())
+
+
+def git_user():
+    """Read the identity used for commits the same way git does, except only
+    from the environment and the user's global config files
+    """
+    user = {}
+    config_home = os.environ.get("XDG_CONFIG_HOME") \
+        or os.path.expanduser("~/.config")
+    paths = [
+        os.path.join(config_home, "git", "config"),
+        os.path.expanduser("~/.gitconfig"),
+    ]
+    for path in paths:
+        try:
+            with open(path, encoding="UTF-8") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            continue
+        section = None
+        for line in lines:
+            line = line.strip()
+            if line.startswith("["):
+                section = line[1:line.find("]")].strip().lower()
+            elif section == "user" and "=" in line:
+                key, value = line.split("=", 1)
+                user[key.strip().lower()] = value.strip().strip('"')
+    name = os.environ.get("GIT_AUTHOR_NAME") or user.get("name")
+    email = os.environ.get("GIT_AUTHOR_EMAIL") or user.get("email")
+    if not name or not email:
         return None
-    git_version_str = git_version_match.group(0)
-    git_version = list(map(int, git_version_str.rstrip().split(".")))
-    if len(git_version) < 3:
-        git_version += [0] * (3 - len(git_version))
-    return tuple(git_version)
+    return f"{name} <{email}>"
+
+
+def git_commit(cwd, git_dir, files, user):
+    tree = {}
+    entries = {}
+    for path, contents in files.items():
+        name = os.path.relpath(path, cwd).replace(os.sep, "/")
+        st = os.stat(path)
+        mode = 0o100755 if st.st_mode & 0o111 and os.name != "nt" \
+            else 0o100644
+        sha = git_object(git_dir, "blob", contents.encode("UTF-8"))
+        *directories, file_name = name.split("/")
+        subtree = tree
+        for directory in directories:
+            subtree = subtree.setdefault(directory, {})
+        subtree[file_name] = (mode, sha)
+        entries[name] = (mode, sha, st)
+    now = int(time.time())
+    offset = time.localtime(now).tm_gmtoff // 60
+    timestamp = "{} {}{:02}{:02}".format(
+        now,
+        "-" if offset < 0 else "+",
+        *divmod(abs(offset), 60),
+    )
+    commit = f"""\
+tree {git_tree(git_dir, tree).hex()}
+author {user} {timestamp}
+committer {user} {timestamp}
+
+Initial commit
+"""
+    sha = git_object(git_dir, "commit", commit.encode("UTF-8"))
+    with open(os.path.join(git_dir, "refs", "heads", "master"), "w") as f:
+        f.write(f"{sha.hex()}\n")
+    git_index(git_dir, entries)
 
 
-def git_init(cwd):
-    git_version = determine_git_version()
-    if git_version is None:
-        print("\nGit can't be found! Can't initialize git for the project.\n")
+def git_init(cwd, files=None):
+    """Initialize a git repository in the project without requiring git to be
+    installed, optionally committing the provided files
+    """
+    git_dir = os.path.join(cwd, ".git")
+    if os.path.exists(git_dir):
         return
-    branch = ""
-    if (2, 28, 0) <= git_version:
-        branch = " -b master"
-    subprocess.run(f"git init{branch}", shell=True, check=True, cwd=cwd)
-    print("""
+    for directory in ["info", "pack"]:
+        mkdir(os.path.join(git_dir, "objects", directory))
+    for directory in ["heads", "tags"]:
+        mkdir(os.path.join(git_dir, "refs", directory))
+    with open(os.path.join(git_dir, "HEAD"), "w", newline="\n") as f:
+        f.write("ref: refs/heads/master\n")
+    extra = ""
+    if sys.platform in ["win32", "darwin"]:
+        extra += "\n\tignorecase = true"
+    if sys.platform == "win32":
+        extra += "\n\tsymlinks = false"
+    with open(os.path.join(git_dir, "config"), "w", newline="\n") as f:
+        filemode = "false" if sys.platform == "win32" else "true"
+        f.write(git_config.format(filemode=filemode, extra=extra))
+    commands = [
+        "git add .",
+        'git commit -m "Initial commit"',
+        "git remote add origin "
+        "https://github.com/<your-account>/<repository>.git",
+        "git push -u origin master",
+    ]
+    if files is not None:
+        user = git_user()
+        if user is None:
+            print("""
+Git user name and email are not configured, so the initial commit has been
+skipped.""")
+        else:
+            git_commit(cwd, git_dir, files, user)
+            commands = commands[2:]
+    commands = "\n".join(f"    {command}" for command in commands)
+    print(f"""
 The project is ready to be used with git. If you are using GitHub, you may
 push the project with the following commands from the project directory:
 
-    git add .
-    git commit -m "Initial commit"
-    git remote add origin https://github.com/<your-account>/<repository>.git
-    git push -u origin master
+{commands}
 """)
 
 
-def create(args, zip):
+class Generator:
+    """Generates projects from the templates in the archive without prompting,
+    printing or exiting. Compiled templates are kept for the lifetime of the
+    object, so any number of projects can be generated while compiling each
+    template at most once.
+    """
+
+    def __init__(self, zip, template_compiler, cache=None):
+        self.zip = zip
+        self.compile_template = template_compiler
+        self.cache = cache
+        self.manifest = build_manifest(zip)
+        self.templates = {}
+
+    def get_template(self, member):
+        """Compile the template in the archive member, looking up and storing
+        the compiled code in the template cache
+        """
+        template = self.templates.get(member)
+        if template is None:
+            code = None
+            if self.cache is not None:
+                code = self.cache.get(member)
+            if code is not None:
+                template = self.compile_template(code)
+            else:
+                source = self.zip.read(member).decode("UTF-8")
+                template = self.compile_template(source, member)
+                if self.cache is not None:
+                    self.cache.put(member, template.code)
+            self.templates[member] = template
+        return template
+
+    def warm(self):
+        """Compile every template up front and save them to the cache
+        """
+        for files in self.manifest.values():
+            for _, member, _ in files:
+                self.get_template(member)
+        self.save_cache()
+
+    def save_cache(self):
+        if self.cache is not None:
+            self.cache.save()
+
+    def generate(self, options):
+        """Render the project described by the options to a mapping of paths
+        relative to the project root to their contents as bytes. The options
+        are the keys of a --batch entry, except the path is replaced by the
+        name of the project. Invalid options raise an ArgumentError.
+        """
+        args = project_args(options, ["name"])
+        d = get_substitutes(args, options.get("name", ""))
+        return {
+            name: self.get_template(member).render(d).encode("UTF-8")
+            for name, member in plan_project(d, self.manifest).items()
+        }
+
+
+def create(args, generator):
     """Create a CMake project according to the provided information
     """
     path = args.path
     if not args.overwrite \
+            and not args.update \
+            and args.output_archive is None \
             and os.path.exists(path) \
             and os.path.isdir(path) \
             and len(os.listdir(path)) != 0:
@@ -352,26 +1140,47 @@ def create(args, zip):
             file=sys.stderr,
         )
         exit(1)
+    # The prompts must not end up in the archive written to stdout
+    prompt_output = sys.stderr if args.output_archive == "-" else sys.stdout
     try: 
-        if args.flags_used:
-            with contextlib.redirect_stdout(io.StringIO()):
-                d = get_substitutes(args, os.path.basename(path))
-        else:
+        with timed("phase", "substitutes"), \
+                contextlib.redirect_stdout(prompt_output):
             d = get_substitutes(args, os.path.basename(path))
     except ArgumentError as e:
         print(str(e), file=sys.stderr)
         exit(1)
+    if timings is not None and timings.root is None:
+        timings.root = path
+    with timed("phase", "plan"):
+        plan = plan_project(d, generator.manifest)
+    if args.update:
+        update_project(path, d, generator, plan, args.serial, args.dry_run)
+        if not args.dry_run:
+            generator.save_cache()
+        return
+    if args.dry_run:
+        for name, member in sorted(plan.items()):
+            print(f"{name} <- {member}")
+        return
+    if args.output_archive is not None:
+        with timed("phase", "render"):
+            files = render_project(os.path.basename(path), d, generator, plan)
+        try:
+            with timed("phase", "write"):
+                write_archive(args.output_archive, files)
+        except ArgumentError as e:
+            print(str(e), file=sys.stderr)
+            exit(1)
+        generator.save_cache()
+        return
     mkdir(path)
-    mapping = {"e": "executable/", "h": "header/", "s": "shared/"}
-    zip_paths = [("c/" if d["c"] else "") + mapping[d["type_id"]], "common/"]
-    if d["c"]:
-        zip_paths.insert(1, "c/common/")
-    if args.overwrite:
-        zip_paths.reverse()
-    for zip_path in (f"templates/{p}" for p in zip_paths):
-        write_dir(path, d, args.overwrite, zipfile.Path(zip, zip_path))
-    git_init(path)
-    cmake_version = "3.21" if d["cmake_321"] else "3.20"
+    files = write_project(path, d, generator, plan, args.serial)
+    with timed("phase", "save template cache"):
+        generator.save_cache()
+    with timed("phase", "git init"):
+        git_init(path, files if args.commit else None)
+    # Presets need at least CMake 3.20, the project itself may need more
+    cmake_version = f"3.{max(int(d['cmake_minor']), 20)}"
     print(f"""\
 To get started with developing the project, make sure you read the generated
 HACKING.md and BUILDING.md files for how to build the project as a developer or
@@ -388,9 +1197,268 @@ https://github.com/friendlyanon/cmake-init/wiki
 You are all set. Have fun programming and create something awesome!""")
 
 
+project_keys = [
+    "type",
+    "std",
+    "c",
+    "pm",
+    "compiler_cache",
+    "generator",
+    "examples",
+    "benchmarks",
+    "modules",
+    "pgo",
+    "time_trace",
+    "fast_link",
+    "test_report",
+    "llvm_cov",
+    "clang_tidy",
+    "cppcheck",
+    "version",
+    "description",
+    "homepage",
+]
+
+
+def read_batch_spec(spec_path):
+    import json
+
+    try:
+        if spec_path == "-":
+            spec = json.load(sys.stdin)
+        else:
+            with open(spec_path, encoding="UTF-8") as f:
+                spec = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ArgumentError(f"Could not read batch spec '{spec_path}': {e}")
+    if not isinstance(spec, list) \
+            or not all(isinstance(entry, dict) for entry in spec):
+        raise ArgumentError("Batch spec must be a JSON array of objects")
+    return spec
+
+
+def project_args(options, extra_keys):
+    """Map the options of a project to the same arguments the command line
+    would produce for the equivalent flags
+    """
+    import argparse
+
+    if not isinstance(options, dict):
+        raise ArgumentError(f"Project options must be an object: {options}")
+    unknown = [
+        key for key in options if key not in project_keys + extra_keys
+    ]
+    if len(unknown) != 0:
+        raise ArgumentError(f"Unknown project options: {unknown}")
+    return argparse.Namespace(
+        flags_used=True,
+        c=bool(options.get("c", False)),
+        type_id=options.get("type", ""),
+        std=str(options.get("std", "")),
+        package_manager=options.get("pm"),
+        compiler_cache=options.get("compiler_cache"),
+        generator=options.get("generator"),
+        examples="n" if options.get("examples", False) else "",
+        benchmarks="n" if options.get("benchmarks", False) else "",
+        modules="y" if options.get("modules", False) else "",
+        pgo="y" if options.get("pgo", False) else "",
+        time_trace="y" if options.get("time_trace", False) else "",
+        fast_link="y" if options.get("fast_link", False) else "",
+        test_report="y" if options.get("test_report", False) else "",
+        llvm_cov="y" if options.get("llvm_cov", False) else "",
+        use_clang_tidy="" if options.get("clang_tidy", True) else "n",
+        use_cppcheck="" if options.get("cppcheck", True) else "n",
+        project_version=options.get("version"),
+        description=options.get("description"),
+        homepage=options.get("homepage"),
+    )
+
+
+def batch_entry_args(entry, cli_args):
+    args = project_args(entry, ["path"])
+    if "path" not in entry:
+        raise ArgumentError(f"Batch entry is missing the path: {entry}")
+    if not isinstance(entry["path"], str) or entry["path"] == "":
+        raise ArgumentError(
+            f"Batch entry path must be a non-empty string: {entry}"
+        )
+    args.path = os.path.realpath(entry["path"])
+    args.overwrite = cli_args.overwrite
+    args.update = cli_args.update
+    args.dry_run = False
+    args.output_archive = None
+    args.serial = cli_args.serial
+    args.commit = cli_args.commit
+    return args
+
+
+def init_batch_worker(zip_filename, template_compiler):
+    import zipfile
+
+    global generator
+    zip = zipfile.ZipFile(zip_filename, "r")
+    generator = Generator(zip, template_compiler, open_template_cache(zip))
+
+
+def run_batch_entry(args):
+    """Create the project of a batch entry and report whether it succeeded.
+    Errors only fail this entry, so the rest of the batch is still created.
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            create(args, generator)
+    except SystemExit:
+        return False
+    except Exception as e:
+        print(f"Error - {args.path}:\n{type(e).__name__}: {e}", file=sys.stderr)
+        return False
+    return True
+
+
+def batch(args, generator):
+    """Create every project from the batch spec in this process, or in a pool
+    of processes, reusing the archive and the compiled templates
+    """
+    import concurrent.futures
+
+    try:
+        entries = [
+            batch_entry_args(entry, args)
+            for entry in read_batch_spec(args.batch)
+        ]
+    except ArgumentError as e:
+        print(str(e), file=sys.stderr)
+        exit(1)
+    if args.jobs > 1 and len(entries) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=args.jobs,
+                initializer=init_batch_worker,
+                initargs=(generator.zip.filename, generator.compile_template),
+        ) as executor:
+            results = list(executor.map(run_batch_entry, entries))
+    else:
+        results = [run_batch_entry(entry) for entry in entries]
+    for entry, result in zip(entries, results):
+        print(f"{'Created' if result else 'Failed'} {entry.path}")
+    failures = results.count(False)
+    if failures != 0:
+        print(f"{failures} of {len(entries)} projects failed", file=sys.stderr)
+        exit(1)
+
+
+def handle_request(generator, line):
+    """Generate the project of a JSON request of the form
+    {"id": ..., "options": {...}} and return the response object
+    """
+    import json
+
+    request_id = None
+    # noinspection PyBroadException
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ArgumentError("Request must be a JSON object")
+        request_id = request.get("id")
+        files = generator.generate(request.get("options", {}))
+    except Exception as e:
+        return {"id": request_id, "error": str(e)}
+    return {
+        "id": request_id,
+        "files": {name: data.decode("UTF-8") for name, data in files.items()},
+    }
+
+
+def serve(generator, address):
+    """Answer JSON requests, one per line, from stdin or from connections to a
+    Unix domain socket at the address, with every template compiled up front
+    """
+    import json
+    import signal
+    import socket
+    import socketserver
+    import stat
+
+    generator.warm()
+    if address == "-":
+        for line in sys.stdin:
+            if line.strip() != "":
+                response = handle_request(generator, line)
+                sys.stdout.write(json.dumps(response) + "\n")
+                sys.stdout.flush()
+        return
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("Unix domain sockets are not supported", file=sys.stderr)
+        exit(1)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if line.strip() != b"":
+                    response = handle_request(generator, line)
+                    self.wfile.write(f"{json.dumps(response)}\n".encode())
+
+    # The socket of a server that was killed is left behind and refuses
+    # connections, so it is replaced, unlike the socket of a running server
+    if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(address)
+            except ConnectionRefusedError:
+                os.remove(address)
+            except OSError:
+                pass
+            else:
+                print(
+                    f"Error - another server is listening on:\n{address}",
+                    file=sys.stderr,
+                )
+                exit(1)
+
+    try:
+        server = socketserver.ThreadingUnixStreamServer(address, Handler)
+    except OSError as e:
+        print(f"Error - could not listen on {address}:\n{e}", file=sys.stderr)
+        exit(1)
+    # SIGTERM unwinds like Ctrl+C does, so the socket is removed in both cases
+    signal.signal(signal.SIGTERM, lambda signum, frame: exit(0))
+    with server:
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(address)
+
+
+def run(args, zip, template_compiler):
+    global generator
+    with timed("phase", "index archive"):
+        cache = open_template_cache(zip)
+        generator = Generator(zip, template_compiler, cache)
+    if args.serve is not None:
+        serve(generator, args.serve)
+    elif args.batch is not None:
+        if timings is not None:
+            timings.root = os.getcwd()
+        batch(args, generator)
+    else:
+        create(args, generator)
+
+
+def needs_archive(argv):
+    """Whether the command line does more than print the version or the help,
+    in which case the entry points can skip opening the archive
+    """
+    return "--version" not in argv and "--help" not in argv
+
+
 def main(zip, template_compiler):
-    global compile_template
-    compile_template = template_compiler
+    global timings
+    start = time.perf_counter()
+    if sys.argv[1:] == ["--version"]:
+        print(__version__)
+        return
+
+    import argparse
 
     p = argparse.ArgumentParser(
         prog="cmake-init",
@@ -404,6 +1472,7 @@ def main(zip, template_compiler):
     )
     p.add_argument("--version", action="version", version=__version__)
     p.set_defaults(overwrite=False, dummy=False, c=False)
+    p.set_defaults(project_version=None, description=None, homepage=None)
     p.add_argument(
         "--c",
         action="store_true",
@@ -411,11 +1480,24 @@ def main(zip, template_compiler):
     )
     p.add_argument(
         "path",
+        nargs="?",
         type=os.path.realpath,
         help="path to generate to, the name is also derived from this",
     )
-    create_flags = \
-        ["type_id", "std", "use_clang_tidy", "use_cppcheck", "examples"]
+    create_flags = [
+        "type_id",
+        "std",
+        "use_clang_tidy",
+        "use_cppcheck",
+        "examples",
+        "benchmarks",
+        "modules",
+        "pgo",
+        "time_trace",
+        "fast_link",
+        "test_report",
+        "llvm_cov",
+    ]
     p.set_defaults(**{k: "" for k in create_flags})
     type_g = p.add_mutually_exclusive_group()
     mapping = {
@@ -458,22 +1540,172 @@ def main(zip, template_compiler):
         action="store_true",
         help="omit checks for existing files and non-empty project root",
     )
+    p.add_argument(
+        "--update",
+        action="store_true",
+        help="regenerate an existing project, but only rewrite the files "
+             "whose contents changed",
+    )
+    p.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="list the files that would be generated without writing them",
+    )
+    p.add_argument(
+        "--output-archive",
+        metavar="file",
+        help="write the project to a .zip, .tar, .tar.gz, .tar.xz or .tar.zst "
+             "archive instead of the path, or as a tar to stdout if \"-\"",
+    )
+    p.add_argument(
+        "--serial",
+        action="store_true",
+        help="write the generated files one by one instead of in parallel",
+    )
+    p.add_argument(
+        "--commit",
+        action="store_true",
+        help="commit the generated files in the new git repository",
+    )
     p.add_argument(
         "--examples",
         action="store_const",
         const="n",
         help="generate examples for a library",
     )
+    p.add_argument(
+        "--benchmarks",
+        action="store_const",
+        const="n",
+        help="generate benchmarks for a library",
+    )
+    p.add_argument(
+        "--modules",
+        action="store_const",
+        const="y",
+        help="make a C++20 static/shared library a named module",
+    )
+    p.add_argument(
+        "--pgo",
+        action="store_const",
+        const="y",
+        help="add presets for profile-guided optimization",
+    )
+    p.add_argument(
+        "--time-trace",
+        action="store_const",
+        const="y",
+        help="add presets for compile-time profiling",
+    )
+    p.add_argument(
+        "--fast-link",
+        action="store_const",
+        const="y",
+        help="add presets for fast linking on Linux",
+    )
+    p.add_argument(
+        "--test-report",
+        action="store_const",
+        const="y",
+        help="add a target reporting the test durations",
+    )
+    p.add_argument(
+        "--llvm-cov",
+        action="store_const",
+        const="y",
+        help="collect coverage with Clang and llvm-cov in CI",
+    )
     p.add_argument(
         "-p",
         metavar="pm",
         dest="package_manager",
         help="package manager to use (Options are: conan, vcpkg)",
     )
+    p.add_argument(
+        "--compiler-cache",
+        metavar="tool",
+        dest="compiler_cache",
+        help="compiler cache to use (Options are: ccache, sccache)",
+    )
+    p.add_argument(
+        "--generator",
+        metavar="name",
+        help="generator to use on Linux and macOS "
+             "(Options are: ninja, ninja-multi-config)",
+    )
+    p.add_argument(
+        "--timings",
+        action="store_true",
+        help="print the time spent in each phase and on the slowest files",
+    )
+    p.add_argument(
+        "--profile",
+        metavar="file",
+        help="write a cProfile profile of the run to the file, or a Chrome "
+             "trace of the phases and files if it ends in .json",
+    )
+    p.add_argument(
+        "--batch",
+        metavar="spec",
+        help="generate every project described in a JSON file ('-' for "
+             "stdin) without prompting, see the README for the format",
+    )
+    p.add_argument(
+        "--serve",
+        metavar="socket",
+        nargs="?",
+        const="-",
+        help="answer JSON requests for generating projects from stdin, or "
+             "from a Unix domain socket, see the README for the format",
+    )
+    p.add_argument(
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="number of processes to use for --batch (default: 1)",
+    )
     args = p.parse_args()
     if args.dummy:
         p.print_help()
         exit(1)
+    if args.batch is not None and args.serve is not None:
+        p.error("--batch cannot be used together with --serve")
+    elif args.batch is not None or args.serve is not None:
+        mode = "--batch" if args.batch is not None else "--serve"
+        if args.path is not None:
+            p.error(f"path cannot be used together with {mode}")
+        if args.dry_run:
+            p.error(f"--dry-run cannot be used together with {mode}")
+        if args.output_archive is not None:
+            p.error(f"--output-archive cannot be used together with {mode}")
+    elif args.path is None:
+        p.error("the following arguments are required: path")
+    if args.output_archive is not None:
+        for flag in ["update", "commit"]:
+            if getattr(args, flag):
+                p.error(f"--{flag} cannot be used with --output-archive")
     flags_used = any(getattr(args, k) != "" for k in create_flags)
     setattr(args, "flags_used", flags_used)
-    create(args, zip)
+    trace = args.profile is not None and args.profile.endswith(".json")
+    if args.timings or trace:
+        timings = Timings()
+        timings.origin = start
+        duration = time.perf_counter() - start
+        timings.add("phase", "parse arguments", start, duration)
+    profiler = None
+    if args.profile is not None and not trace:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run(args, zip, template_compiler)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile)
+        if trace:
+            timings.write_trace(args.profile)
+        if args.timings:
+            timings.report()
@@ -16,9 +16,11 @@
 
 # Website: https://github.com/friendlyanon/cmake-init
 
+import builtins
 import re
+import types
 
-__all__ = ["compile_template"]
+__all__ = ["Template", "compile_template"]
 
 block_regex = re.compile(
     r"(.*?)({% .+? %}|{= .+? =})|(.+?)\Z",
@@ -26,30 +28,57 @@ block_regex = re.compile(
 )
 
 
-def compile_template(template_source, globals):
+class Template:
+    """A template compiled to a code object once, which can be rendered any
+    number of times with different substitutes
+    """
+
+    def __init__(self, code):
+        self.code = code
+
+    def render(self, substitutes):
+        scope = dict(substitutes)
+        scope["__builtins__"] = builtins
+        return types.FunctionType(self.code, scope)()
+
+
+def translate_template(template_source):
     depth = 0
-    python_source = ["def f():\n _result = []"]
+    python_source = ["def render():\n _result = []\n _append = _result.append"]
+    parts = []
 
     def add_line(line):
         python_source.append(" " * (depth + 1) + line)
 
-    def add_repr(o):
-        add_line("_result.append(str(" + repr(o) + "))")
+    def add_literal(o):
+        if parts and isinstance(parts[-1], str):
+            parts[-1] += o
+        else:
+            parts.append(o)
+
+    def add_expression(expression):
+        parts.append([expression])
+
+    def flush():
+        if parts:
+            add_line("_append(" + " + ".join(
+                repr(part) if isinstance(part, str) else f"str({part[0]})"
+                for part in parts
+            ) + ")")
+            parts.clear()
 
     for match in block_regex.finditer(template_source):
         before, block, tail = match.groups()
         if not block:
-            add_repr(tail)
-            continue
-        if block == "end":
-            depth -= 1
+            add_literal(tail)
             continue
         if before:
-            add_repr(before)
+            add_literal(before)
         inner = block[3:-3]
         if block[1:2] == "=":
-            add_repr(globals[inner])
+            add_expression(inner)
             continue
+        flush()
         if inner == "end":
             depth -= 1
             continue
@@ -61,7 +90,14 @@ def compile_template(template_source, globals):
     if depth != 0:
         raise SyntaxError("Block not properly terminated")
 
+    flush()
     add_line("return \"\".join(_result)")
-    locals = {}
-    exec("\n".join(python_source), globals, locals)
-    return locals["f"]
+    return "\n".join(python_source)
+
+
+def compile_template(template_source, filename="<template>"):
+    if isinstance(template_source, types.CodeType):
+        return Template(template_source)
+    module = compile(translate_template(template_source), filename, "exec")
+    code = next(c for c in module.co_consts if isinstance(c, types.CodeType))
+    return Template(code)
@@ -0,0 +1,10 @@
+#pragma once
+
+/*
+ * Headers that are expensive to parse and rarely change, e.g. the ones from the
+ * standard library, go here. This header is only used when {= name =}_PCH is
+ * enabled, so the sources must still include everything they use themselves.
+ */
+
+#include <stdlib.h>
+#include <string.h>
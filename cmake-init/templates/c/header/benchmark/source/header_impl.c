@@ -0,0 +1,2 @@
+#define {= uc_name =}_IMPLEMENTATION
+#include "{= name =}/{= name =}.h"
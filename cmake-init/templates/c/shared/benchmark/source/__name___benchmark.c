@@ -0,0 +1,73 @@
+{% if pm %}#include "{= name =}/{= name =}.h"
+
+#include <benchmark/benchmark.h>
+
+#include <cstdlib>
+#include <type_traits>
+
+namespace
+{
+
+template<typename T>
+void c_free(T* ptr)
+{
+  using U = typename std::remove_cv<T>::type;
+  std::free(static_cast<void*>(const_cast<U*>(ptr)));
+}
+
+void bm_exported_function(benchmark::State& state)
+{
+  for (auto _ : state) {
+    auto const* name = exported_function();
+    benchmark::DoNotOptimize(name);
+    c_free(name);
+  }
+}
+
+}  // namespace
+
+BENCHMARK(bm_exported_function);{% else %}#include "{= name =}/{= name =}.h"
+
+#include <stdio.h>
+#include <string.h>
+#include <time.h>
+
+/* Stores the results, so the measured calls are not optimized away */
+static size_t volatile sink = 0;
+
+int main(int argc, char const* argv[])
+{
+  unsigned long const batch = 1000;
+  unsigned long iterations = 0;
+  unsigned long i = 0;
+  clock_t start = 0;
+  clock_t elapsed = 0;
+  double cpu_time = 0.0;
+  FILE* output = stdout;
+
+  /* Read the clock only once per batch, so it does not dominate the results */
+  start = clock();
+  do {
+    for (i = 0; i != batch; ++i) {
+      sink = strlen(exported_function());
+    }
+    iterations += batch;
+    elapsed = clock() - start;
+  } while (elapsed < CLOCKS_PER_SEC);
+
+  cpu_time =
+      (double)elapsed * 1e9 / (double)CLOCKS_PER_SEC / (double)iterations;
+  if (argc > 1) {
+    output = fopen(argv[1], "w");
+    if (output == NULL) {
+      return 1;
+    }
+  }
+
+  /* The results are written in the JSON format of Google Benchmark */
+  (void)fputs("{\"benchmarks\":[{\"name\":\"bm_exported_function\",", output);
+  (void)fprintf(
+      output, "\"iterations\":%lu,\"cpu_time\":%f,", iterations, cpu_time);
+  (void)fputs("\"time_unit\":\"ns\"}]}\n", output);
+  return output == stdout || fclose(output) == 0 ? 0 : 1;
+}{% end %}
@@ -0,0 +1,176 @@
+cmake_minimum_required(VERSION 3.{= cmake_minor =})
+
+macro(default name)
+  if(NOT DEFINED "${name}")
+    set("${name}" "${ARGN}")
+  endif()
+endmacro()
+
+default(BINARY_DIR "${CMAKE_SOURCE_DIR}")
+default(OUTPUT_PREFIX "${BINARY_DIR}/build-profile")
+default(TOP 20)
+
+# ---- Merge the traces ----
+
+# Clang writes a trace for each translation unit next to its object file. The
+# events of each trace are moved to a process of their own in the merged trace,
+# which is named after the translation unit
+file(GLOB_RECURSE files "${BINARY_DIR}/*.json")
+set(traces "")
+foreach(file IN LISTS files)
+  file(READ "${file}" head LIMIT 14)
+  if(head MATCHES "^{\"traceEvents\""
+      AND NOT file STREQUAL "${OUTPUT_PREFIX}.json")
+    list(APPEND traces "${file}")
+  endif()
+endforeach()
+
+if(traces STREQUAL "")
+  message(
+      FATAL_ERROR
+      "No traces were found in ${BINARY_DIR}\n"
+      "Build the project with Clang and ENABLE_TIME_TRACE enabled first."
+  )
+endif()
+
+# The key of the durations is written as a character class, so the spell
+# checker does not mistake it for a typo
+set(duration_key "\"[d]ur\":")
+
+file(WRITE "${OUTPUT_PREFIX}.json" "{\"traceEvents\":[")
+set(sep "")
+set(pid 0)
+set(units "")
+set(content "")
+foreach(trace IN LISTS traces)
+  math(EXPR pid "${pid} + 1")
+  file(RELATIVE_PATH unit "${BINARY_DIR}" "${trace}")
+  string(REGEX REPLACE "\\.json$" "" unit "${unit}")
+
+  file(READ "${trace}" events)
+  string(FIND "${events}" "]" end REVERSE)
+  math(EXPR length "${end} - 16")
+  string(SUBSTRING "${events}" 16 "${length}" events)
+  string(REGEX REPLACE "\"pid\":[0-9]+" "\"pid\":${pid}" events "${events}")
+  string(
+      REGEX REPLACE
+      "\"name\":\"process_name\",\"args\":{\"name\":\"[^\"]*\""
+      "\"name\":\"process_name\",\"args\":{\"name\":\"${unit}\""
+      events "${events}"
+  )
+  file(APPEND "${OUTPUT_PREFIX}.json" "${sep}${events}")
+  set(sep ",")
+
+  if(events MATCHES "${duration_key}([0-9]+),\"name\":\"ExecuteCompiler\"")
+    list(APPEND units "${CMAKE_MATCH_1}|${unit}")
+  endif()
+  string(REPLACE ";" "," events "${events}")
+  string(APPEND content "${events}")
+endforeach()
+file(APPEND "${OUTPUT_PREFIX}.json" "]}\n")
+
+# ---- Summarize the expensive headers and instantiations ----
+
+set(detail "\"args\":{\"detail\":\"(([^\"\\\\]|\\\\.)*)\"")
+
+# Durations of the complete events
+set(kinds "(Source|InstantiateClass|InstantiateFunction)")
+string(
+    REGEX MATCHALL "${duration_key}[0-9]+,\"name\":\"${kinds}\",${detail}"
+    complete "${content}"
+)
+# Newer versions of Clang write the headers as pairs of begin and end events
+set(begin "\"ts\":[0-9]+,\"cat\":\"Source\",\"ph\":\"b\",[^{}]*${detail}}}")
+set(end ",{[^{}]*\"ts\":[0-9]+,\"cat\":\"Source\",\"ph\":\"e\"")
+string(REGEX MATCHALL "${begin}${end}" async "${content}")
+
+set(headers "")
+set(instantiations "")
+foreach(event IN LISTS complete async)
+  if(event MATCHES "^${duration_key}([0-9]+),\"name\":\"([A-Za-z]+)\",${detail}")
+    set(duration "${CMAKE_MATCH_1}")
+    set(kind "${CMAKE_MATCH_2}")
+    set(name "${CMAKE_MATCH_3}")
+  elseif(event MATCHES "^\"ts\":([0-9]+),[^{}]*${detail}}},{[^{}]*\"ts\":([0-9]+)")
+    math(EXPR duration "${CMAKE_MATCH_4} - ${CMAKE_MATCH_1}")
+    set(kind Source)
+    set(name "${CMAKE_MATCH_2}")
+  else()
+    continue()
+  endif()
+  # Backslashes in paths on Windows are escaped
+  string(REPLACE "\\\\" "\\" name "${name}")
+
+  string(MD5 key "${kind}|${name}")
+  if(NOT DEFINED "total_${key}")
+    set("total_${key}" 0)
+    set("count_${key}" 0)
+    set("name_${key}" "${name}")
+    if(kind STREQUAL "Source")
+      list(APPEND headers "${key}")
+    else()
+      list(APPEND instantiations "${key}")
+    endif()
+  endif()
+  math(EXPR "total_${key}" "${total_${key}} + ${duration}")
+  math(EXPR "count_${key}" "${count_${key}} + 1")
+endforeach()
+
+# Zero padded durations sort correctly as strings
+function(pad var value)
+  string(LENGTH "${value}" length)
+  math(EXPR length "15 - ${length}")
+  string(SUBSTRING "000000000000000" 0 "${length}" zeros)
+  set("${var}" "${zeros}${value}" PARENT_SCOPE)
+endfunction()
+
+# Appends the TOP longest entries to the summary
+function(summarize title)
+  set(entries "")
+  foreach(entry IN LISTS ARGN)
+    string(REGEX MATCH "^[0-9]+" duration "${entry}")
+    pad(padded "${duration}")
+    string(REGEX REPLACE "^[0-9]+" "${padded}" entry "${entry}")
+    list(APPEND entries "${entry}")
+  endforeach()
+  list(SORT entries ORDER DESCENDING)
+
+  set(lines "")
+  set(index 0)
+  foreach(entry IN LISTS entries)
+    if(NOT index LESS TOP)
+      break()
+    endif()
+    math(EXPR index "${index} + 1")
+    string(REGEX MATCH "^([0-9]+)\\|(.*)$" entry "${entry}")
+    math(EXPR ms "${CMAKE_MATCH_1} / 1000")
+    string(APPEND lines "\n${ms} ms  ${CMAKE_MATCH_2}")
+  endforeach()
+  if(NOT lines STREQUAL "")
+    set(summary "${summary}\n${title}:\n${lines}\n" PARENT_SCOPE)
+  endif()
+endfunction()
+
+set(summary "")
+summarize("Slowest translation units" ${units})
+foreach(group IN ITEMS headers instantiations)
+  set(entries "")
+  foreach(key IN LISTS "${group}")
+    list(
+        APPEND entries
+        "${total_${key}}|${name_${key}} (count: ${count_${key}})"
+    )
+  endforeach()
+  if(group STREQUAL "headers")
+    summarize("Most expensive headers, including their includes" ${entries})
+  else()
+    summarize("Most expensive template instantiations" ${entries})
+  endif()
+endforeach()
+
+file(WRITE "${OUTPUT_PREFIX}.txt" "${summary}")
+message(
+    "${summary}\n"
+    "The merged trace was written to ${OUTPUT_PREFIX}.json, which can be "
+    "opened in chrome://tracing or https://ui.perfetto.dev"
+)
@@ -0,0 +1,147 @@
+# Helpers for the lint.cmake and spell.cmake scripts, which use these
+# variables:
+#
+# BASE_REF: only check the files that differ from this git ref
+# STAMP_FILE: skip the files that passed the last run with the same key
+# JOBS: number of processes to run in parallel
+# BATCH_SIZE: maximum number of files passed to a single process
+
+cmake_host_system_information(RESULT cores QUERY NUMBER_OF_LOGICAL_CORES)
+
+default(BASE_REF "")
+default(STAMP_FILE "")
+default(JOBS "${cores}")
+default(BATCH_SIZE 64)
+
+# Splits the files into the ones that have to be checked and the ones already
+# known to be good, because they did not change since BASE_REF or since they
+# were recorded in STAMP_FILE
+function(changed_files check_var good_var key)
+  set(check "${ARGN}")
+  set(good "")
+
+  if(NOT BASE_REF STREQUAL "")
+    execute_process(
+        COMMAND git diff --name-only --relative "${BASE_REF}" --
+        WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
+        RESULT_VARIABLE result
+        OUTPUT_VARIABLE changed
+    )
+    if(NOT result EQUAL "0")
+      message(FATAL_ERROR "Could not diff against '${BASE_REF}'")
+    endif()
+    execute_process(
+        COMMAND git ls-files --others --exclude-standard
+        WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
+        OUTPUT_VARIABLE untracked
+    )
+    string(REPLACE "\n" ";" changed "${changed}${untracked}")
+    set(check "")
+    foreach(file IN LISTS ARGN)
+      if(file IN_LIST changed)
+        list(APPEND check "${file}")
+      endif()
+    endforeach()
+  endif()
+
+  if(NOT STAMP_FILE STREQUAL "" AND EXISTS "${STAMP_FILE}")
+    file(STRINGS "${STAMP_FILE}" stamps)
+    list(GET stamps 0 stamp_key)
+    if(stamp_key STREQUAL key)
+      set(files "${check}")
+      set(check "")
+      foreach(file IN LISTS files)
+        file(SHA1 "${CMAKE_SOURCE_DIR}/${file}" hash)
+        if("${hash} ${file}" IN_LIST stamps)
+          list(APPEND good "${file}")
+        else()
+          list(APPEND check "${file}")
+        endif()
+      endforeach()
+    endif()
+  endif()
+
+  set("${check_var}" "${check}" PARENT_SCOPE)
+  set("${good_var}" "${good}" PARENT_SCOPE)
+endfunction()
+
+# Records the hashes of the files that passed in STAMP_FILE. When BASE_REF
+# narrowed down the files, the entries of the other files are kept, so a later
+# run without BASE_REF does not check them again.
+function(write_stamps key)
+  if(STAMP_FILE STREQUAL "")
+    return()
+  endif()
+  set(content "${key}\n")
+  if(NOT BASE_REF STREQUAL "" AND EXISTS "${STAMP_FILE}")
+    file(STRINGS "${STAMP_FILE}" stamps)
+    list(GET stamps 0 stamp_key)
+    if(stamp_key STREQUAL key)
+      list(REMOVE_AT stamps 0)
+      foreach(stamp IN LISTS stamps)
+        # The file name follows the SHA-1 hash and a space
+        string(SUBSTRING "${stamp}" 41 -1 file)
+        if(NOT file IN_LIST ARGN)
+          string(APPEND content "${stamp}\n")
+        endif()
+      endforeach()
+    endif()
+  endif()
+  foreach(file IN LISTS ARGN)
+    file(SHA1 "${CMAKE_SOURCE_DIR}/${file}" hash)
+    string(APPEND content "${hash} ${file}\n")
+  endforeach()
+  file(WRITE "${STAMP_FILE}" "${content}")
+endfunction()
+
+# Runs the command on the files split into batches, JOBS batches at a time.
+# The processes of a single execute_process call run in parallel, but their
+# standard output is piped into each other, so the command should report on
+# its standard error.
+function(run_in_batches passed_var output_var command)
+  list(LENGTH ARGN count)
+  math(EXPR size "(${count} + ${JOBS} - 1) / ${JOBS}")
+  if(size GREATER BATCH_SIZE)
+    set(size "${BATCH_SIZE}")
+  endif()
+
+  set(passed "")
+  set(output "")
+  set(index 0)
+  while(index LESS count)
+    set(commands "")
+    set(starts "")
+    foreach(job RANGE 1 "${JOBS}")
+      if(NOT index LESS count)
+        break()
+      endif()
+      list(SUBLIST ARGN "${index}" "${size}" batch)
+      list(APPEND commands COMMAND ${command} ${batch})
+      list(APPEND starts "${index}")
+      math(EXPR index "${index} + ${size}")
+    endforeach()
+
+    execute_process(
+        ${commands}
+        WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
+        RESULTS_VARIABLE results
+        OUTPUT_VARIABLE stdout
+        ERROR_VARIABLE stderr
+    )
+    string(APPEND output "${stdout}${stderr}")
+
+    list(LENGTH starts jobs)
+    math(EXPR last "${jobs} - 1")
+    foreach(job RANGE "${last}")
+      list(GET results "${job}" result)
+      if(result EQUAL "0")
+        list(GET starts "${job}" start)
+        list(SUBLIST ARGN "${start}" "${size}" batch)
+        list(APPEND passed ${batch})
+      endif()
+    endforeach()
+  endwhile()
+
+  set("${passed_var}" "${passed}" PARENT_SCOPE)
+  set("${output_var}" "${output}" PARENT_SCOPE)
+endfunction()
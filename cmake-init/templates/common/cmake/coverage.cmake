@@ -1,23 +1,138 @@
+# ---- Backend ----
+
+# lcov and genhtml process the gcov data of GCC on a single thread, which gcovr
+# can do in parallel{% if llvm_cov %}, while Clang's source-based coverage data is processed by
+# llvm-profdata and llvm-cov, both of which use all cores by default{% end %}
+# The coverage presets select the backend, lcov is the default for builds using
+# their own flags
+set(
+    COVERAGE_BACKEND lcov
+    CACHE STRING "Tool to process the coverage data with (lcov{% if llvm_cov %}, gcovr or llvm-cov{% else %} or gcovr{% end %})"
+)
+set_property(CACHE COVERAGE_BACKEND PROPERTY STRINGS lcov gcovr{% if llvm_cov %} llvm-cov{% end %})
+
+if(COVERAGE_BACKEND STREQUAL "lcov")
+  set(
+      coverage_trace
+      lcov -c -q
+      -o "${PROJECT_BINARY_DIR}/coverage.info"
+      -d "${PROJECT_BINARY_DIR}"
+      --include "${PROJECT_SOURCE_DIR}/*"
+  )
+  set(
+      coverage_html
+      genhtml --legend -f -q
+      "${PROJECT_BINARY_DIR}/coverage.info"
+      -p "${PROJECT_SOURCE_DIR}"
+      -o "${PROJECT_BINARY_DIR}/coverage_html"
+  )
+elseif(COVERAGE_BACKEND STREQUAL "gcovr")
+  # The JSON trace keeps the details the HTML report needs, so the gcov data is
+  # only processed once, and the trailing slash makes gcovr create the directory
+  cmake_host_system_information(RESULT cores QUERY NUMBER_OF_LOGICAL_CORES)
+  set(
+      coverage_trace
+      gcovr -r "${PROJECT_SOURCE_DIR}" -j "${cores}"
+      --lcov "${PROJECT_BINARY_DIR}/coverage.info"
+      --json "${PROJECT_BINARY_DIR}/coverage.json"
+      "${PROJECT_BINARY_DIR}"
+  )
+  set(
+      coverage_html
+      gcovr -r "${PROJECT_SOURCE_DIR}"
+      -a "${PROJECT_BINARY_DIR}/coverage.json"
+      --html-details "${PROJECT_BINARY_DIR}/coverage_html/"
+  ){% if llvm_cov %}
+elseif(COVERAGE_BACKEND STREQUAL "llvm-cov")
+  if(NOT CMAKE_C{% if cpp %}XX{% end %}_COMPILER_ID MATCHES "Clang")
+    message(
+        FATAL_ERROR
+        "The llvm-cov coverage backend requires Clang, but the compiler is "
+        "${CMAKE_C{% if cpp %}XX{% end %}_COMPILER_ID}"
+    )
+  endif()
+
+  set(
+      COVERAGE_PROFILE_DIR "${PROJECT_BINARY_DIR}/profiles"
+      CACHE PATH "Directory of the raw profiles written by the tests"
+  )
+
+  # The tools are versioned along with the compiler on some distributions
+  string(
+      REGEX MATCH "^[0-9]+"
+      llvm_major "${CMAKE_C{% if cpp %}XX{% end %}_COMPILER_VERSION}"
+  )
+  get_filename_component(
+      llvm_bin "${CMAKE_C{% if cpp %}XX{% end %}_COMPILER}" DIRECTORY
+  )
+  find_program(
+      COVERAGE_LLVM_PROFDATA
+      NAMES "llvm-profdata-${llvm_major}" llvm-profdata
+      HINTS "${llvm_bin}"
+  )
+  find_program(
+      COVERAGE_LLVM_COV
+      NAMES "llvm-cov-${llvm_major}" llvm-cov
+      HINTS "${llvm_bin}"
+  )
+  mark_as_advanced(COVERAGE_LLVM_PROFDATA COVERAGE_LLVM_COV)
+
+  # The binaries contain the coverage mapping, and only code under the source
+  # directory is reported
+  set(coverage_objects "$<TARGET_FILE:{= name =}_test>"){% if lib %}
+  get_target_property(type {= name =}_{= name =} TYPE)
+  if(type STREQUAL "SHARED_LIBRARY")
+    list(APPEND coverage_objects -object "$<TARGET_FILE:{= name =}_{= name =}>")
+  endif(){% end %}
+  set(profdata "${PROJECT_BINARY_DIR}/coverage.profdata")
+
+  set(
+      coverage_trace
+      "${CMAKE_COMMAND}"
+      -D "LLVM_PROFDATA=${COVERAGE_LLVM_PROFDATA}"
+      -D "LLVM_COV=${COVERAGE_LLVM_COV}"
+      -D "PROFILE_DIR=${COVERAGE_PROFILE_DIR}"
+      -D "PROFDATA=${profdata}"
+      -D "OUTPUT=${PROJECT_BINARY_DIR}/coverage.info"
+      -P "${PROJECT_SOURCE_DIR}/cmake/llvm-cov-trace.cmake"
+      ${coverage_objects} "${PROJECT_SOURCE_DIR}"
+  )
+  set(
+      coverage_html
+      "${COVERAGE_LLVM_COV}" show -format=html
+      "-instr-profile=${profdata}"
+      "-output-dir=${PROJECT_BINARY_DIR}/coverage_html"
+      ${coverage_objects} "${PROJECT_SOURCE_DIR}"
+  ){% end %}
+else()
+  message(FATAL_ERROR "Unknown coverage backend: ${COVERAGE_BACKEND}")
+endif()
+
 # ---- Variables ----
 
+# The commands follow the backend when it changes in an existing build
+# directory, unless they were customized, i.e. they differ from the defaults
+# of the previous configure
+foreach(kind IN ITEMS TRACE HTML)
+  string(TOLOWER "${kind}" default)
+  set(default "${coverage_${default}}")
+  if(DEFINED CACHE{COVERAGE_${kind}_DEFAULT}
+      AND COVERAGE_${kind}_COMMAND STREQUAL COVERAGE_${kind}_DEFAULT)
+    set_property(CACHE "COVERAGE_${kind}_COMMAND" PROPERTY VALUE "${default}")
+  endif()
+  set("COVERAGE_${kind}_DEFAULT" "${default}" CACHE INTERNAL "")
+endforeach()
+
 # We use variables separate from what CTest uses, because those have
 # customization issues
 set(
-    COVERAGE_TRACE_COMMAND
-    lcov -c -q
-    -o "${PROJECT_BINARY_DIR}/coverage.info"
-    -d "${PROJECT_BINARY_DIR}"
-    --include "${PROJECT_SOURCE_DIR}/*"
+    COVERAGE_TRACE_COMMAND "${coverage_trace}"
     CACHE STRING
     "; separated command to generate a trace for the 'coverage' target"
 )
 
 set(
-    COVERAGE_HTML_COMMAND
-    genhtml --legend -f -q
-    "${PROJECT_BINARY_DIR}/coverage.info"
-    -p "${PROJECT_SOURCE_DIR}"
-    -o "${PROJECT_BINARY_DIR}/coverage_html"
+    COVERAGE_HTML_COMMAND "${coverage_html}"
     CACHE STRING
     "; separated command to generate an HTML report for the 'coverage' target"
 )
@@ -2,7 +2,8 @@ include(cmake/folders.cmake)
 
 include(CTest)
 if(BUILD_TESTING)
-  add_subdirectory(test)
+  add_subdirectory(test){% if test_report %}
+  include(cmake/test-report-targets.cmake){% end %}
 endif()
 {% if exe %}
 add_custom_target(
@@ -21,8 +22,32 @@ option(ENABLE_COVERAGE "Enable coverage support separate from CTest's" OFF)
 if(ENABLE_COVERAGE)
   include(cmake/coverage.cmake)
 endif()
-
-include(cmake/lint-targets.cmake)
-include(cmake/spell-targets.cmake)
+{% if pgo %}
+option(ENABLE_PGO "Enable the target collecting profiles for PGO" OFF)
+if(ENABLE_PGO)
+  include(cmake/pgo.cmake)
+endif()
+{% end %}{% if time_trace %}
+if(ENABLE_TIME_TRACE)
+  set(
+      BUILD_PROFILE_TOP 20
+      CACHE STRING "Number of entries per list in the build profile summary"
+  )
+  add_custom_target(
+      build-profile
+      COMMAND "${CMAKE_COMMAND}"
+      -D "BINARY_DIR=${PROJECT_BINARY_DIR}"
+      -D "TOP=${BUILD_PROFILE_TOP}"
+      -P "${PROJECT_SOURCE_DIR}/cmake/build-profile.cmake"
+      COMMENT "Merging and summarizing the compile-time traces"
+      VERBATIM
+  )
+endif()
+{% end %}
+option(ENABLE_LINT_TARGETS "Enable the format and spell check targets" ON)
+if(ENABLE_LINT_TARGETS)
+  include(cmake/lint-targets.cmake)
+  include(cmake/spell-targets.cmake)
+endif()
 
 add_folders(Project)
@@ -1,4 +1,4 @@
-cmake_minimum_required(VERSION 3.{% if cmake_321 %}21{% else %}14{% end %})
+cmake_minimum_required(VERSION 3.{= cmake_minor =})
 
 foreach(var IN ITEMS PROJECT_BINARY_DIR PROJECT_SOURCE_DIR)
   if(NOT DEFINED "${var}")
@@ -0,0 +1,55 @@
+# ---- Linker ----
+
+# mold is preferred, because it links large binaries the fastest, then lld
+set(
+    FAST_LINK_LINKER ""
+    CACHE STRING "Linker for fast linking (mold or lld), detected if empty"
+)
+
+set(linker "${FAST_LINK_LINKER}")
+if(linker STREQUAL "")
+  find_program(FAST_LINK_MOLD mold)
+  find_program(FAST_LINK_LLD NAMES ld.lld lld)
+  mark_as_advanced(FAST_LINK_MOLD FAST_LINK_LLD)
+  if(FAST_LINK_MOLD)
+    set(linker mold)
+  elseif(FAST_LINK_LLD)
+    set(linker lld)
+  endif()
+endif()
+
+if(linker STREQUAL "")
+  message(WARNING "Neither mold nor lld was found, using the default linker")
+  return()
+endif()
+
+# The compiler selects the linker, which older versions of GCC cannot do for
+# mold, so check that it works before using it
+include(CheckC{% if cpp %}XX{% end %}SourceCompiles)
+set(CMAKE_REQUIRED_LINK_OPTIONS "-fuse-ld=${linker}")
+check_c{% if cpp %}xx{% end %}_source_compiles(
+    "int main(void) { return 0; }"
+    {= name =}_FUSE_LD_${linker}
+)
+unset(CMAKE_REQUIRED_LINK_OPTIONS)
+if(NOT {= name =}_FUSE_LD_${linker})
+  message(WARNING "The compiler cannot link with ${linker}")
+  return()
+endif()
+
+# CMake 3.29 knows how to select the linker for each compiler, older versions
+# fall back to passing the flag directly
+if(CMAKE_VERSION VERSION_GREATER_EQUAL "3.29")
+  string(TOUPPER "${linker}" CMAKE_LINKER_TYPE)
+else()
+  add_link_options("-fuse-ld=${linker}")
+endif()
+
+# ---- Split DWARF ----
+
+# The debug info stays in .dwo files next to the objects, so the linker does
+# not have to copy it, and the index lets the debugger load it lazily
+add_compile_options(
+    "$<$<OR:$<CONFIG:Debug>,$<CONFIG:RelWithDebInfo>>:-gsplit-dwarf>"
+)
+add_link_options("-Wl,--gdb-index")
@@ -17,9 +17,9 @@ include(GNUInstallDirs)
 set(package {= name =})
 
 install(
-    DIRECTORY{% if lib %}
+    DIRECTORY{% if modules %} "${PROJECT_BINARY_DIR}/export/"{% else %}{% if lib %}
    {% end %} include/{% if lib %}
-    "${PROJECT_BINARY_DIR}/export/"{% end %}
+    "${PROJECT_BINARY_DIR}/export/"{% end %}{% end %}
     DESTINATION "${CMAKE_INSTALL_INCLUDEDIR}"
     COMPONENT {= name =}_Development
 )
@@ -36,7 +36,10 @@ install(
     ARCHIVE #
     COMPONENT {= name =}_Development
     INCLUDES #
-    DESTINATION "${CMAKE_INSTALL_INCLUDEDIR}"{% end %}{% if header %}
+    DESTINATION "${CMAKE_INSTALL_INCLUDEDIR}"{% if modules %}
+    FILE_SET CXX_MODULES #
+    DESTINATION "${CMAKE_INSTALL_INCLUDEDIR}"
+    COMPONENT {= name =}_Development{% end %}{% end %}{% if header %}
     INCLUDES DESTINATION "${CMAKE_INSTALL_INCLUDEDIR}"{% end %}
 ){% if not exe %}
 
@@ -70,7 +73,8 @@ install(
 install(
     EXPORT {= name =}Targets
     NAMESPACE {= name =}::
-    DESTINATION "${{= name =}_INSTALL_CMAKEDIR}"
+    DESTINATION "${{= name =}_INSTALL_CMAKEDIR}"{% if modules %}
+    CXX_MODULES_DIRECTORY modules{% end %}
     COMPONENT {= name =}_Development
 ){% end %}
 
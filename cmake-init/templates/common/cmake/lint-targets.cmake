@@ -1,10 +1,11 @@
 set(
     FORMAT_PATTERNS
     source/*.c{% if cpp %}pp{% end %} source/*.h{% if cpp %}pp{% end %}
-    include/*.h{% if cpp %}pp{% end %}
+    include/*.h{% if cpp %}pp{% end %}{% if modules %} include/*.cppm{% end %}
     test/*.c{% if cpp %}pp{% end %} test/*.h{% if cpp %}pp{% end %}{% if cpp_examples %}
     example/*.cpp example/*.hpp{% end %}{% if c_examples %}
-    example/*.c example/*.h{% end %}
+    example/*.c example/*.h{% end %}{% if benchmarks %}
+    benchmark/*.c{% if cpp %}pp{% end %} benchmark/*.h{% if cpp %}pp{% end %}{% end %}
     CACHE STRING
     "; separated patterns relative to the project source dir to format"
 )
@@ -16,6 +17,7 @@ add_custom_target(
     COMMAND "${CMAKE_COMMAND}"
     -D "FORMAT_COMMAND=${FORMAT_COMMAND}"
     -D "PATTERNS=${FORMAT_PATTERNS}"
+    -D "STAMP_FILE=${PROJECT_BINARY_DIR}/format.stamp"
     -P "${PROJECT_SOURCE_DIR}/cmake/lint.cmake"
     WORKING_DIRECTORY "${PROJECT_SOURCE_DIR}"
     COMMENT "Linting the code"
@@ -28,6 +30,7 @@ add_custom_target(
     -D "FORMAT_COMMAND=${FORMAT_COMMAND}"
     -D "PATTERNS=${FORMAT_PATTERNS}"
     -D FIX=YES
+    -D "STAMP_FILE=${PROJECT_BINARY_DIR}/format.stamp"
     -P "${PROJECT_SOURCE_DIR}/cmake/lint.cmake"
     WORKING_DIRECTORY "${PROJECT_SOURCE_DIR}"
     COMMENT "Fixing the code"
@@ -1,4 +1,4 @@
-cmake_minimum_required(VERSION 3.{% if cmake_321 %}21{% else %}14{% end %})
+cmake_minimum_required(VERSION 3.{= cmake_minor =})
 
 macro(default name)
   if(NOT DEFINED "${name}")
@@ -10,41 +10,65 @@ default(FORMAT_COMMAND clang-format)
 default(
     PATTERNS
     source/*.c{% if cpp %}pp{% end %} source/*.h{% if cpp %}pp{% end %}
-    include/*.h{% if cpp %}pp{% end %}
+    include/*.h{% if cpp %}pp{% end %}{% if modules %} include/*.cppm{% end %}
     test/*.c{% if cpp %}pp{% end %} test/*.h{% if cpp %}pp{% end %}{% if cpp_examples %}
     example/*.cpp example/*.hpp{% end %}{% if c_examples %}
-    example/*.c example/*.h{% end %}
+    example/*.c example/*.h{% end %}{% if benchmarks %}
+    benchmark/*.c{% if cpp %}pp{% end %} benchmark/*.h{% if cpp %}pp{% end %}{% end %}
 )
 default(FIX NO)
 
-set(flag --output-replacements-xml)
-set(args OUTPUT_VARIABLE output)
+include("${CMAKE_CURRENT_LIST_DIR}/changed-files.cmake")
+
+# The key invalidates the stamps when the formatter or its config changes
+execute_process(
+    COMMAND "${FORMAT_COMMAND}" --version
+    OUTPUT_VARIABLE key
+    OUTPUT_STRIP_TRAILING_WHITESPACE
+)
+file(SHA1 "${CMAKE_SOURCE_DIR}/.clang-format" config_hash)
+string(REPLACE "\n" " " key "${key} ${config_hash}")
+
+file(GLOB_RECURSE files RELATIVE "${CMAKE_SOURCE_DIR}" ${PATTERNS})
+changed_files(files good "${key}" ${files})
+
+# clang-format reports on stderr with --dry-run, so multiple instances can run
+# in parallel
+set(formatter "${FORMAT_COMMAND}" --style=file --dry-run -Werror)
 if(FIX)
-  set(flag -i)
-  set(args "")
+  set(formatter "${FORMAT_COMMAND}" --style=file -i)
 endif()
 
-file(GLOB_RECURSE files ${PATTERNS})
-set(badly_formatted "")
+set(passed "")
 set(output "")
-string(LENGTH "${CMAKE_SOURCE_DIR}/" path_prefix_length)
+if(NOT files STREQUAL "")
+  run_in_batches(passed output "${formatter}" ${files})
+endif()
 
+set(failed "")
 foreach(file IN LISTS files)
-  execute_process(
-      COMMAND "${FORMAT_COMMAND}" --style=file "${flag}" "${file}"
-      WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
-      RESULT_VARIABLE result
-      ${args}
-  )
-  if(NOT result EQUAL "0")
-    message(FATAL_ERROR "'${file}': formatter returned with ${result}")
+  if(NOT file IN_LIST passed)
+    list(APPEND failed "${file}")
   endif()
-  if(NOT FIX AND output MATCHES "\n<replacement offset")
-    string(SUBSTRING "${file}" "${path_prefix_length}" -1 relative_file)
-    list(APPEND badly_formatted "${relative_file}")
+endforeach()
+
+if(NOT failed STREQUAL ""
+    AND (FIX OR NOT output MATCHES "code should be clang-formatted"))
+  write_stamps("${key}" ${good} ${passed})
+  message(FATAL_ERROR "Formatter failed:\n${output}")
+endif()
+
+# A failed batch may still contain files that are formatted correctly
+set(badly_formatted "")
+foreach(file IN LISTS failed)
+  string(FIND "\n${output}" "\n${file}:" index)
+  if(index EQUAL "-1")
+    list(APPEND passed "${file}")
+  else()
+    list(APPEND badly_formatted "${file}")
   endif()
-  set(output "")
 endforeach()
+write_stamps("${key}" ${good} ${passed})
 
 if(NOT badly_formatted STREQUAL "")
   list(JOIN badly_formatted "\n" bad_list)
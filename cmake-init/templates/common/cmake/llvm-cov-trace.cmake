@@ -0,0 +1,60 @@
+cmake_minimum_required(VERSION 3.{= cmake_minor =})
+
+foreach(var IN ITEMS PROFILE_DIR PROFDATA OUTPUT)
+  if(NOT DEFINED "${var}")
+    message(FATAL_ERROR "${var} must be defined")
+  endif()
+endforeach()
+
+macro(default name)
+  if(NOT DEFINED "${name}")
+    set("${name}" "${ARGN}")
+  endif()
+endmacro()
+
+default(LLVM_PROFDATA llvm-profdata)
+default(LLVM_COV llvm-cov)
+
+# The arguments after the script are the binaries and the source directories
+# passed to llvm-cov
+set(args "")
+set(is_arg NO)
+math(EXPR last "${CMAKE_ARGC} - 1")
+foreach(i RANGE "${last}")
+  if(is_arg)
+    list(APPEND args "${CMAKE_ARGV${i}}")
+  elseif(CMAKE_ARGV${i} STREQUAL CMAKE_CURRENT_LIST_FILE)
+    set(is_arg YES)
+  endif()
+endforeach()
+
+if(NOT IS_DIRECTORY "${PROFILE_DIR}")
+  message(
+      FATAL_ERROR
+      "No profiles were found in ${PROFILE_DIR}\n"
+      "Run the tests of the instrumented build first."
+  )
+endif()
+
+# ---- Merge the raw profiles ----
+
+execute_process(
+    COMMAND "${LLVM_PROFDATA}" merge -sparse -o "${PROFDATA}" "${PROFILE_DIR}"
+    RESULT_VARIABLE result
+)
+if(NOT result EQUAL "0")
+  message(FATAL_ERROR "llvm-profdata returned with ${result}")
+endif()
+
+# ---- Export an LCOV trace ----
+
+# llvm-cov writes the trace to stdout
+execute_process(
+    COMMAND "${LLVM_COV}" export -format=lcov "-instr-profile=${PROFDATA}"
+    ${args}
+    OUTPUT_FILE "${OUTPUT}"
+    RESULT_VARIABLE result
+)
+if(NOT result EQUAL "0")
+  message(FATAL_ERROR "llvm-cov returned with ${result}")
+endif()
@@ -0,0 +1,50 @@
+# ---- Variables ----
+
+# The instrumented build writes the profiles to this directory, which the
+# pgo-instrument and pgo-use presets also pass to the compiler
+set(
+    PGO_PROFILE_DIR "${PROJECT_BINARY_DIR}/profiles"
+    CACHE PATH "Directory of the collected profiles"
+)
+
+set(
+    PGO_TRAIN_COMMAND
+    "${CMAKE_CTEST_COMMAND}" -C "$<CONFIG>" --output-on-failure
+    CACHE STRING
+    "; separated command to run the workload for the 'pgo-train' target"
+)
+
+# Clang writes raw profiles that have to be merged before they can be used,
+# while GCC uses the .gcda files as they are
+set(pgo_merge_default "")
+if(CMAKE_C{% if cpp %}XX{% end %}_COMPILER_ID MATCHES "Clang")
+  set(
+      pgo_merge_default
+      llvm-profdata merge
+      -o "${PGO_PROFILE_DIR}/default.profdata"
+      "${PGO_PROFILE_DIR}"
+  )
+endif()
+set(
+    PGO_MERGE_COMMAND "${pgo_merge_default}"
+    CACHE STRING
+    "; separated command to merge the profiles for the 'pgo-train' target"
+)
+
+# ---- PGO target ----
+
+set(pgo_merge "")
+if(NOT PGO_MERGE_COMMAND STREQUAL "")
+  set(pgo_merge COMMAND ${PGO_MERGE_COMMAND})
+endif()
+
+add_custom_target(
+    pgo-train
+    COMMAND "${CMAKE_COMMAND}" -E remove -f
+    "${PGO_PROFILE_DIR}/default.profdata"
+    COMMAND ${PGO_TRAIN_COMMAND}
+    ${pgo_merge}
+    COMMENT "Collecting profiles for profile-guided optimization"
+    WORKING_DIRECTORY "${PROJECT_BINARY_DIR}"
+    VERBATIM
+)
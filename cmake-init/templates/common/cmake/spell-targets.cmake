@@ -4,6 +4,7 @@ add_custom_target(
     spell-check
     COMMAND "${CMAKE_COMMAND}"
     -D "SPELL_COMMAND=${SPELL_COMMAND}"
+    -D "STAMP_FILE=${PROJECT_BINARY_DIR}/spell.stamp"
     -P "${PROJECT_SOURCE_DIR}/cmake/spell.cmake"
     WORKING_DIRECTORY "${PROJECT_SOURCE_DIR}"
     COMMENT "Checking spelling"
@@ -15,6 +16,7 @@ add_custom_target(
     COMMAND "${CMAKE_COMMAND}"
     -D "SPELL_COMMAND=${SPELL_COMMAND}"
     -D FIX=YES
+    -D "STAMP_FILE=${PROJECT_BINARY_DIR}/spell.stamp"
     -P "${PROJECT_SOURCE_DIR}/cmake/spell.cmake"
     WORKING_DIRECTORY "${PROJECT_SOURCE_DIR}"
     COMMENT "Fixing spelling errors"
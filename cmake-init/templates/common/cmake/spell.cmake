@@ -1,4 +1,4 @@
-cmake_minimum_required(VERSION 3.{% if cmake_321 %}21{% else %}14{% end %})
+cmake_minimum_required(VERSION 3.{= cmake_minor =})
 
 macro(default name)
   if(NOT DEFINED "${name}")
@@ -8,22 +8,109 @@ endmacro()
 
 default(SPELL_COMMAND codespell)
 default(FIX NO)
+default(WORKER NO)
 
 set(flag "")
 if(FIX)
   set(flag -w)
 endif()
 
+# Worker mode: check the files passed after the script's path and report on
+# stderr, so the outputs of the parallel workers are not piped into each other
+if(WORKER)
+  set(paths "")
+  set(is_file NO)
+  math(EXPR last "${CMAKE_ARGC} - 1")
+  foreach(i RANGE "${last}")
+    if(is_file)
+      list(APPEND paths "./${CMAKE_ARGV${i}}")
+    elseif(CMAKE_ARGV${i} STREQUAL CMAKE_CURRENT_LIST_FILE)
+      set(is_file YES)
+    endif()
+  endforeach()
+  execute_process(
+      COMMAND "${SPELL_COMMAND}" ${flag} ${paths}
+      WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
+      RESULT_VARIABLE result
+      OUTPUT_VARIABLE output
+  )
+  if(FIX OR NOT result EQUAL "0")
+    message("${output}")
+  endif()
+  if(NOT result EQUAL "0")
+    message(FATAL_ERROR "Spell checker returned with ${result}")
+  endif()
+  return()
+endif()
+
+include("${CMAKE_CURRENT_LIST_DIR}/changed-files.cmake")
+
 execute_process(
-    COMMAND "${SPELL_COMMAND}" ${flag}
+    COMMAND git ls-files --cached --others --exclude-standard
     WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
     RESULT_VARIABLE result
+    OUTPUT_VARIABLE files
+    ERROR_QUIET
 )
 
-if(result EQUAL "65")
+# Outside of a git repository, check the whole tree in one go
+if(NOT result EQUAL "0")
+  execute_process(
+      COMMAND "${SPELL_COMMAND}" ${flag}
+      WORKING_DIRECTORY "${CMAKE_SOURCE_DIR}"
+      RESULT_VARIABLE result
+  )
+  if(result EQUAL "65")
+    message(FATAL_ERROR "Run again with FIX=YES to fix these errors.")
+  elseif(result EQUAL "64")
+    message(FATAL_ERROR "Spell checker printed the usage info. Bad arguments?")
+  elseif(NOT result EQUAL "0")
+    message(FATAL_ERROR "Spell checker returned with ${result}")
+  endif()
+  return()
+endif()
+
+string(REPLACE "\n" ";" tracked "${files}")
+set(files "")
+foreach(file IN LISTS tracked)
+  if(EXISTS "${CMAKE_SOURCE_DIR}/${file}"
+      AND NOT IS_DIRECTORY "${CMAKE_SOURCE_DIR}/${file}")
+    list(APPEND files "${file}")
+  endif()
+endforeach()
+
+# The key invalidates the stamps when the checker or its config changes
+execute_process(
+    COMMAND "${SPELL_COMMAND}" --version
+    OUTPUT_VARIABLE key
+    OUTPUT_STRIP_TRAILING_WHITESPACE
+)
+file(SHA1 "${CMAKE_SOURCE_DIR}/.codespellrc" config_hash)
+string(REPLACE "\n" " " key "${key} ${config_hash}")
+
+changed_files(files good "${key}" ${files})
+
+set(
+    worker
+    "${CMAKE_COMMAND}" -D "SPELL_COMMAND=${SPELL_COMMAND}" -D "FIX=${FIX}"
+    -D WORKER=YES -P "${CMAKE_CURRENT_LIST_FILE}"
+)
+set(passed "")
+set(output "")
+if(NOT files STREQUAL "")
+  run_in_batches(passed output "${worker}" ${files})
+endif()
+write_stamps("${key}" ${good} ${passed})
+
+if(output STREQUAL "")
+  return()
+endif()
+
+message({% if cmake_321 %}NOTICE {% end %}"${output}")
+if(output MATCHES "returned with 65")
   message(FATAL_ERROR "Run again with FIX=YES to fix these errors.")
-elseif(result EQUAL "64")
+elseif(output MATCHES "returned with 64")
   message(FATAL_ERROR "Spell checker printed the usage info. Bad arguments?")
-elseif(NOT result EQUAL "0")
-  message(FATAL_ERROR "Spell checker returned with ${result}")
+elseif(output MATCHES "returned with")
+  message(FATAL_ERROR "Spell checker failed")
 endif()
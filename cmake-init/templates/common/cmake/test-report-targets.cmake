@@ -0,0 +1,24 @@
+set(
+    TEST_REPORT_BASELINE "${PROJECT_BINARY_DIR}/test-baseline.json"
+    CACHE FILEPATH "Test durations the 'test-report' target compares against"
+)
+
+set(
+    TEST_REPORT_THRESHOLD 150
+    CACHE STRING
+    "Percentage of the baseline duration above which a test has regressed"
+)
+
+add_custom_target(
+    test-report
+    COMMAND "${CMAKE_COMMAND}"
+    -D "CTEST_COMMAND=${CMAKE_CTEST_COMMAND}"
+    -D "CONFIG=$<CONFIG>"
+    -D "BINARY_DIR=${PROJECT_BINARY_DIR}"
+    -D "BASELINE=${TEST_REPORT_BASELINE}"
+    -D "THRESHOLD=${TEST_REPORT_THRESHOLD}"
+    -P "${PROJECT_SOURCE_DIR}/cmake/test-report.cmake"
+    COMMENT "Running the tests and reporting their durations"
+    VERBATIM
+)
+add_dependencies(test-report {= name =}_test)
@@ -0,0 +1,139 @@
+cmake_minimum_required(VERSION 3.{= cmake_minor =})
+
+foreach(var IN ITEMS CTEST_COMMAND BINARY_DIR)
+  if(NOT DEFINED "${var}")
+    message(FATAL_ERROR "${var} must be defined")
+  endif()
+endforeach()
+
+macro(default name)
+  if(NOT DEFINED "${name}")
+    set("${name}" "${ARGN}")
+  endif()
+endmacro()
+
+cmake_host_system_information(RESULT cores QUERY NUMBER_OF_LOGICAL_CORES)
+
+default(CONFIG "")
+default(BASELINE "")
+default(JOBS "${cores}")
+default(TOP 10)
+default(THRESHOLD 150)
+default(MIN_DELTA 100)
+
+set(junit "${BINARY_DIR}/test-report.xml")
+set(report "${BINARY_DIR}/test-report.json")
+
+# ---- Run the tests ----
+
+# CTest also records the durations in Testing/Temporary/CTestCostData.txt,
+# which it uses to start the longest tests first in the next parallel run
+file(REMOVE "${junit}")
+execute_process(
+    COMMAND "${CTEST_COMMAND}" -C "${CONFIG}" -j "${JOBS}"
+    --output-on-failure --output-junit "${junit}"
+    WORKING_DIRECTORY "${BINARY_DIR}"
+    RESULT_VARIABLE test_result
+)
+if(NOT EXISTS "${junit}")
+  message(FATAL_ERROR "CTest did not write ${junit}, which needs CTest 3.21")
+endif()
+
+# ---- Collect the durations ----
+
+file(READ "${junit}" content)
+string(REPLACE ";" "," content "${content}")
+string(
+    REGEX MATCHALL "<testcase name=\"[^\"]*\" classname=\"[^\"]*\" time=\"[^\"]*\""
+    cases "${content}"
+)
+
+set(entries "")
+set(json "")
+set(sep "")
+foreach(case IN LISTS cases)
+  string(REGEX MATCH "name=\"([^\"]*)\".* time=\"([^\"]*)\"" case "${case}")
+  set(name "${CMAKE_MATCH_1}")
+  # The durations are in seconds, tiny ones possibly in scientific notation
+  set(ms 0)
+  if(CMAKE_MATCH_2 MATCHES "^([0-9]+)(\\.([0-9]*))?$")
+    string(SUBSTRING "${CMAKE_MATCH_3}000" 0 3 fraction)
+    math(EXPR ms "${CMAKE_MATCH_1} * 1000 + ${fraction}")
+  endif()
+  string(MD5 key "${name}")
+  set("ms_${key}" "${ms}")
+  set("name_${key}" "${name}")
+
+  string(LENGTH "${ms}" length)
+  math(EXPR length "12 - ${length}")
+  string(SUBSTRING "000000000000" 0 "${length}" zeros)
+  list(APPEND entries "${zeros}${ms}|${key}")
+
+  string(REPLACE "\\" "\\\\" name "${name}")
+  string(REPLACE "\"" "\\\"" name "${name}")
+  string(APPEND json "${sep}\n  \"${name}\": ${ms}")
+  set(sep ",")
+endforeach()
+file(WRITE "${report}" "{${json}\n}\n")
+
+# ---- Report the slowest tests ----
+
+list(SORT entries ORDER DESCENDING)
+set(summary "Slowest tests:\n")
+set(index 0)
+foreach(entry IN LISTS entries)
+  if(NOT index LESS TOP)
+    break()
+  endif()
+  math(EXPR index "${index} + 1")
+  string(REGEX MATCH "^0*([0-9]+)\\|(.*)$" entry "${entry}")
+  set(key "${CMAKE_MATCH_2}")
+  string(APPEND summary "\n${CMAKE_MATCH_1} ms  ${name_${key}}")
+endforeach()
+
+# ---- Compare against the baseline ----
+
+# A test regressed if it got slower than THRESHOLD percent of its baseline
+# duration and by at least MIN_DELTA milliseconds, which filters out the noise
+# of short tests
+if(NOT BASELINE STREQUAL "" AND EXISTS "${BASELINE}")
+  file(READ "${BASELINE}" baseline)
+  string(REPLACE ";" "," baseline "${baseline}")
+  string(
+      REGEX MATCHALL "\"([^\"\\\\]|\\\\.)*\": [0-9]+"
+      baseline "${baseline}"
+  )
+  set(regressions "")
+  foreach(entry IN LISTS baseline)
+    string(REGEX MATCH "^\"(.*)\": ([0-9]+)$" entry "${entry}")
+    set(before "${CMAKE_MATCH_2}")
+    string(REPLACE "\\\"" "\"" name "${CMAKE_MATCH_1}")
+    string(REPLACE "\\\\" "\\" name "${name}")
+    string(MD5 key "${name}")
+    if(NOT DEFINED "ms_${key}")
+      continue()
+    endif()
+    set(after "${ms_${key}}")
+    math(EXPR limit "${before} * ${THRESHOLD} / 100")
+    math(EXPR delta "${after} - ${before}")
+    if(after GREATER limit AND NOT delta LESS MIN_DELTA)
+      string(APPEND regressions "\n${before} ms -> ${after} ms  ${name}")
+    endif()
+  endforeach()
+  if(regressions STREQUAL "")
+    string(APPEND summary "\n\nNo regressions against ${BASELINE}")
+  else()
+    string(APPEND summary "\n\nRegressions against ${BASELINE}:\n${regressions}")
+  endif()
+elseif(NOT BASELINE STREQUAL "")
+  string(
+      APPEND summary
+      "\n\nCopy ${report} to ${BASELINE} to compare later runs against it"
+  )
+endif()
+
+message("\n${summary}\n")
+
+if(NOT test_result EQUAL "0")
+  message(FATAL_ERROR "CTest returned with ${test_result}")
+endif()
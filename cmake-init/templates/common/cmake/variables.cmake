@@ -9,7 +9,87 @@ if(PROJECT_IS_TOP_LEVEL)
   option(BUILD_SHARED_LIBS "Build shared libs." OFF){% end %}
 endif()
 
-{% if cpp and lib %}# ---- Suppress C4251 on Windows ----
+# ---- Build speed ----
+
+# Unity builds and precompiled headers require CMake 3.16, while consumers may
+# use older versions, so these are opt-in and only available to developers
+if(PROJECT_IS_TOP_LEVEL)
+  option({= name =}_UNITY_BUILD "Build the targets of the project as unity builds" OFF){% if header %}
+  mark_as_advanced({= name =}_UNITY_BUILD)
+  if({= name =}_UNITY_BUILD AND CMAKE_VERSION VERSION_LESS "3.16")
+    message(FATAL_ERROR "Unity builds require CMake 3.16")
+  endif(){% else %}
+  option({= name =}_PCH "Use precompiled headers for the targets of the project" OFF)
+  mark_as_advanced({= name =}_UNITY_BUILD {= name =}_PCH)
+  if(({= name =}_UNITY_BUILD OR {= name =}_PCH) AND CMAKE_VERSION VERSION_LESS "3.16")
+    message(FATAL_ERROR "Unity builds and precompiled headers require CMake 3.16")
+  endif(){% end %}
+  if({= name =}_UNITY_BUILD)
+    set(CMAKE_UNITY_BUILD ON)
+  endif()
+endif()
+
+# ---- Interprocedural optimization ----
+
+# IPO, also known as LTO, is checked for only when requested, so it does not
+# slow down the configure step and does not affect consumers of the project
+if(PROJECT_IS_TOP_LEVEL)
+  option(ENABLE_IPO "Enable interprocedural optimization for the project" OFF)
+  if(ENABLE_IPO)
+    include(CheckIPOSupported)
+    check_ipo_supported(
+        RESULT {= name =}_IPO_SUPPORTED
+        OUTPUT ipo_output
+    )
+    if({= name =}_IPO_SUPPORTED)
+      set(CMAKE_INTERPROCEDURAL_OPTIMIZATION ON)
+    else()
+      message(WARNING "IPO is not supported: ${ipo_output}")
+    endif()
+  endif()
+endif()
+
+{% if fast_link %}# ---- Fast linking ----
+
+# Linking with mold or lld and keeping the debug info out of the binaries speed
+# up incremental rebuilds, which only developers on Linux are likely to need
+if(PROJECT_IS_TOP_LEVEL)
+  option(ENABLE_FAST_LINK "Link with mold or lld and split the debug info" OFF)
+  if(ENABLE_FAST_LINK)
+    if(CMAKE_SYSTEM_NAME STREQUAL "Linux"
+        AND CMAKE_C{% if cpp %}XX{% end %}_COMPILER_ID MATCHES "GNU|Clang")
+      include(cmake/fast-link.cmake)
+    else()
+      message(WARNING "Fast linking requires GCC or Clang on Linux")
+    endif()
+  endif()
+endif()
+
+{% end %}{% if time_trace %}# ---- Compile-time profiling ----
+
+# Clang writes a trace next to each object file, which the build-profile target
+# in developer mode merges and summarizes, while GCC{% if cpp %} and MSVC{% end %} print their
+# reports in the build output
+# The flags are set here, before any target is declared, so they apply to all
+if(PROJECT_IS_TOP_LEVEL)
+  option(ENABLE_TIME_TRACE "Report the time spent compiling each file" OFF)
+  if(ENABLE_TIME_TRACE)
+    if(CMAKE_C{% if cpp %}XX{% end %}_COMPILER_ID MATCHES "Clang")
+      string(APPEND CMAKE_C{% if cpp %}XX{% end %}_FLAGS " -ftime-trace")
+    elseif(CMAKE_C{% if cpp %}XX{% end %}_COMPILER_ID STREQUAL "GNU")
+      string(APPEND CMAKE_C{% if cpp %}XX{% end %}_FLAGS " -ftime-report"){% if cpp %}
+    elseif(MSVC)
+      string(APPEND CMAKE_CXX_FLAGS " /d1reportTime"){% end %}
+    else()
+      message(
+          WARNING
+          "Compile-time profiling is not supported for this compiler"
+      )
+    endif()
+  endif()
+endif()
+
+{% end %}{% if cpp and lib %}# ---- Suppress C4251 on Windows ----
 
 # Please see include/{= name =}/{= name =}.hpp for more details
 set(pragma_suppress_c4251 "
@@ -15,4 +15,5 @@ class Recipe(ConanFile):
 
     def build_requirements(self):{% if catch3 %}
         self.test_requires("catch2/3.7.1"){% else %}
-        self.test_requires("catch2/2.13.10", options={"with_main": True}){% end %}
+        self.test_requires("catch2/2.13.10", options={"with_main": True}){% end %}{% if benchmarks %}
+        self.test_requires("benchmark/1.9.0"){% end %}
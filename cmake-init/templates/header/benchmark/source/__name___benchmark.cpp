@@ -0,0 +1,67 @@
+{% if pm %}#include "{= name =}/{= name =}.hpp"
+
+#include <benchmark/benchmark.h>
+
+namespace
+{
+
+void bm_name(benchmark::State& state)
+{
+  for (auto _ : state) {
+    benchmark::DoNotOptimize(name());
+  }
+}
+
+}  // namespace
+
+BENCHMARK(bm_name);{% else %}#include <chrono>
+#include <cstddef>
+#include <fstream>
+#include <iostream>
+
+#include "{= name =}/{= name =}.hpp"
+
+namespace
+{
+
+// Stores the results, so the measured calls are not optimized away
+std::size_t volatile sink = 0;
+
+void report(std::ostream& output, unsigned long iterations, double real_time)
+{
+  output << R"({"benchmarks":[{"name":"bm_name","iterations":)" << iterations
+         << R"(,"real_time":)" << real_time << R"(,"time_unit":"ns"}]})"
+         << '\n';
+}
+
+}  // namespace
+
+auto main(int argc, char const* argv[]) -> int
+{
+  using clock = std::chrono::steady_clock;
+  auto const batch = 1000UL;
+  auto iterations = 0UL;
+  auto elapsed = clock::duration::zero();
+
+  // Read the clock only once per batch, so it does not dominate the results
+  auto const start = clock::now();
+  do {
+    for (auto i = 0UL; i != batch; ++i) {
+      sink = name().size();
+    }
+    iterations += batch;
+    elapsed = clock::now() - start;
+  } while (elapsed < std::chrono::seconds(1));
+
+  auto const real_time =
+      std::chrono::duration<double, std::nano>(elapsed).count()
+      / static_cast<double>(iterations);
+  if (argc < 2) {
+    report(std::cout, iterations, real_time);
+    return 0;
+  }
+
+  auto output = std::ofstream(argv[1]);
+  report(output, iterations, real_time);
+  return output ? 0 : 1;
+}{% end %}
@@ -1,9 +1,15 @@
-#include <string>
+{% if modules %}module;
 
-#include "{= name =}/{= name =}.hpp"{% if pm %}
+#include <string>{% if pm %}
 
 #include <fmt/core.h>{% end %}
 
+module {= module_name =};{% else %}#include <string>
+
+#include "{= name =}/{= name =}.hpp"{% if pm %}
+
+#include <fmt/core.h>{% end %}{% end %}
+
 exported_class::exported_class()
     : m_name {{% if pm %}fmt::format("{}", "{= name =}"){% else %}"{= name =}"{% end %}}
 {
@@ -1,9 +1,13 @@
 #include <string>
-
+{% if modules %}{% if pm %}
+#include <catch2/catch{% if catch3 %}_test_macros{% end %}.hpp>
+{% end %}
+import {= module_name =};
+{% else %}
 #include "{= name =}/{= name =}.hpp"
 {% if pm %}
 #include <catch2/catch{% if catch3 %}_test_macros{% end %}.hpp>
-
+{% end %}{% end %}{% if pm %}
 TEST_CASE("Name is {= name =}", "[library]")
 {
   auto const exported = exported_class {};
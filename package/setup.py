@@ -1,8 +1,10 @@
 import setuptools
+import setuptools.command.build_py
 import subprocess
 import os
 import re
 import shutil
+import zipfile
 
 with open("../cmake-init/cmake_init.py") as f:
     for line in f:
@@ -27,17 +29,23 @@ shutil.copy("../cmake-init/template.py", "cmake_init_lib")
 with open("cmake_init_lib/__init__.py", "w") as f:
     f.write("""\
 import os
-import zipfile
-
-from .cmake_init import main
-from .template import compile_template
+import sys
 
 def pypi_main():
-    zip = zipfile.ZipFile(
-        os.path.join(os.path.dirname(__file__), "cmake-init.zip"),
-        "r",
-    )
+    from .cmake_init import main, needs_archive
+
     try:
+        if not needs_archive(sys.argv[1:]):
+            main(None, None)
+            return
+
+        import zipfile
+        from .template import compile_template
+
+        zip = zipfile.ZipFile(
+            os.path.join(os.path.dirname(__file__), "cmake-init.zip"),
+            "r",
+        )
         # open a dummy fd to keep the zip from being closed
         with zip.open("templates/common/.gitignore") as dummy_fp:
             main(zip, compile_template)
@@ -53,6 +61,22 @@ if __name__ == "__main__":
     pypi_main()
 """)
 
+
+class build_py(setuptools.command.build_py.build_py):
+    """Ship compiled templates for the Python version building the wheel, so
+    fresh installs using the same version start with a warm template cache
+    """
+
+    def run(self):
+        super().run()
+        from cmake_init_lib.cmake_init import build_template_cache
+        from cmake_init_lib.template import compile_template
+
+        package_dir = os.path.join(self.build_lib, "cmake_init_lib")
+        zip_path = os.path.join(package_dir, "cmake-init.zip")
+        with zipfile.ZipFile(zip_path, "r") as zip:
+            build_template_cache(zip, compile_template, package_dir)
+
 with open("../README.md") as f:
     long_description = f.read()
 
@@ -68,6 +92,7 @@ setuptools.setup(
     packages=["cmake_init_lib"],
     package_data={"cmake_init_lib": ["cmake-init.zip"]},
     include_package_data=True,
+    cmdclass={"build_py": build_py},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Environment :: Console",
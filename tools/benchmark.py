@@ -0,0 +1,284 @@
+# cmake-init - The missing CMake project initializer
+# Copyright (C) 2021  friendlyanon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Website: https://github.com/friendlyanon/cmake-init
+
+"""\
+Benchmark cmake-init in-process for every combination of project type,
+language, standard, package manager and examples. Each combination is timed
+cold (no compiled templates in the process) and warm, and the results are
+saved as JSON, which can be compared with the results of another run.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipapp
+import zipfile
+
+source_dir = os.path.join(os.path.dirname(__file__), "..", "cmake-init")
+
+# The top level entries of the source directory that the release ships
+archive_entries = {"__main__.py", "cmake_init.py", "template.py", "templates"}
+
+import_snippet = """\
+import time
+start = time.perf_counter()
+import cmake_init, template
+print(time.perf_counter() - start)
+"""
+
+
+def archive_filter(path):
+    """Keep stray files and bytecode in the source directory out of the
+    archive, so it matches the released one
+    """
+    return path.parts[0] in archive_entries and "__pycache__" not in path.parts
+
+
+def time_import(pycache_prefix):
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_prefix)
+    # The warm import has to find the bytecode written by the cold one
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-c", import_snippet],
+        cwd=source_dir,
+        env=env,
+        capture_output=True,
+        check=True,
+    )
+    return float(result.stdout)
+
+
+def combinations():
+    for c, types, stds in [
+        (False, ["e", "h", "s"], ["11", "14", "17", "20"]),
+        (True, ["e", "h", "s"], ["90", "99", "11", "17", "23"]),
+    ]:
+        for type_id, std, pm in itertools.product(
+                types,
+                stds,
+                ["none", "conan", "vcpkg"],
+        ):
+            for examples in [False] if type_id == "e" else [False, True]:
+                yield {
+                    "type": type_id,
+                    "std": std,
+                    "pm": pm,
+                    "c": c,
+                    "examples": examples,
+                }
+
+
+def combination_name(entry):
+    return "{}-{}{}-{}{}".format(
+        "c" if entry["c"] else "cpp",
+        entry["type"],
+        entry["std"],
+        entry["pm"],
+        "-examples" if entry["examples"] else "",
+    )
+
+
+def directory_size(path):
+    files = 0
+    size = 0
+    for directory, subdirectories, names in os.walk(path):
+        if ".git" in subdirectories:
+            subdirectories.remove(".git")
+        files += len(names)
+        size += sum(os.path.getsize(os.path.join(directory, name))
+                    for name in names)
+    return files, size
+
+
+def generate(cmake_init, generator, args):
+    cmake_init.timings = cmake_init.Timings()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cmake_init.create(args, generator)
+    total = time.perf_counter() - start
+    result = {"compile": 0, "render": 0, "write": 0, "total": total}
+    for category, name, _, duration, _ in cmake_init.timings.spans:
+        if category == "compile" or category == "render":
+            result[category] += duration
+        elif category == "phase" and name == "write":
+            result["write"] += duration
+    cmake_init.timings = None
+    return result
+
+
+def best_of(results):
+    return {key: min(r[key] for r in results) for key in results[0]}
+
+
+def run(cmake_init, generator, work_dir, repeat):
+    cli_args = argparse.Namespace(
+        overwrite=False,
+        update=False,
+        serial=False,
+        commit=False,
+    )
+    report = []
+    for i, entry in enumerate(combinations()):
+        name = combination_name(entry)
+
+        def args(suffix):
+            path = os.path.join(work_dir, f"{name}-{suffix}")
+            return cmake_init.batch_entry_args(dict(entry, path=path), cli_args)
+
+        generator.templates.clear()
+        cold = generate(cmake_init, generator, args("cold"))
+        warm = best_of([
+            generate(cmake_init, generator, args(f"warm{j}"))
+            for j in range(repeat)
+        ])
+        tracemalloc.start()
+        with contextlib.redirect_stdout(io.StringIO()):
+            cmake_init.create(args("memory"), generator)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        files, size = directory_size(args("cold").path)
+        report.append({
+            "name": name,
+            "cold": cold,
+            "warm": warm,
+            "files": files,
+            "bytes_written": size,
+            "peak_python_memory": peak_memory,
+        })
+        shutil.rmtree(work_dir)
+        os.mkdir(work_dir)
+        print(
+            f"[{i + 1:>3}] {name:<28} "
+            f"cold {cold['total'] * 1000:7.2f} ms  "
+            f"warm {warm['total'] * 1000:7.2f} ms",
+            file=sys.stderr,
+        )
+    return report
+
+
+def totals(results):
+    phases = ["compile", "render", "write", "total"]
+    return {
+        state: {
+            phase: sum(r[state][phase] for r in results["combinations"])
+            for phase in phases
+        }
+        for state in ["cold", "warm"]
+    }
+
+
+def print_summary(results, baseline):
+    print(f"cmake-init {results['version']} on Python {results['python']}")
+    print(
+        f"import: cold {results['import']['cold'] * 1000:.2f} ms, "
+        f"warm {results['import']['warm'] * 1000:.2f} ms"
+    )
+    print(
+        f"{len(results['combinations'])} projects, "
+        f"{results['bytes_written']} bytes written, "
+        f"max RSS {results['max_rss_kib']} KiB"
+    )
+    print(f"\n{'':<8}{'phase':<10}{'total (ms)':>12}{'change':>10}")
+    for state, phases in results["totals"].items():
+        for phase, duration in phases.items():
+            change = ""
+            if baseline is not None:
+                old = baseline["totals"][state][phase]
+                if old != 0:
+                    change = f"{(duration - old) / old * 100:+.1f}%"
+            print(f"{state:<8}{phase:<10}{duration * 1000:>12.2f}{change:>10}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument(
+        "-o",
+        "--output",
+        metavar="file",
+        default="benchmark.json",
+        help="file to save the results to (default: benchmark.json)",
+    )
+    p.add_argument(
+        "--baseline",
+        metavar="file",
+        help="results of a previous run to compare the totals against",
+    )
+    p.add_argument(
+        "--repeat",
+        metavar="N",
+        type=int,
+        default=3,
+        help="number of warm runs to take the best of (default: 3)",
+    )
+    args = p.parse_args()
+
+    # Caches outside of the process would make cold runs warm
+    os.environ["CMAKE_INIT_CACHE_DIR"] = ""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pycache_prefix = os.path.join(temp_dir, "pycache")
+        cold_import = time_import(pycache_prefix)
+        warm_import = time_import(pycache_prefix)
+
+        sys.path.insert(0, source_dir)
+        import cmake_init
+        from template import compile_template
+
+        archive = os.path.join(temp_dir, "cmake-init.pyz")
+        zipapp.create_archive(source_dir, archive, filter=archive_filter)
+        work_dir = os.path.join(temp_dir, "work")
+        os.mkdir(work_dir)
+        with zipfile.ZipFile(archive, "r") as zip:
+            generator = cmake_init.Generator(zip, compile_template)
+            combinations_report = \
+                run(cmake_init, generator, work_dir, args.repeat)
+
+    results = {
+        "version": cmake_init.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "import": {"cold": cold_import, "warm": warm_import},
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "bytes_written":
+            sum(r["bytes_written"] for r in combinations_report),
+        "combinations": combinations_report,
+    }
+    results["totals"] = totals(results)
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline, encoding="UTF-8") as f:
+            baseline = json.load(f)
+    with open(args.output, "w", encoding="UTF-8") as f:
+        json.dump(results, f, indent=2)
+    print_summary(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
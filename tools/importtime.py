@@ -0,0 +1,119 @@
+# cmake-init - The missing CMake project initializer
+# Copyright (C) 2021  friendlyanon
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Website: https://github.com/friendlyanon/cmake-init
+
+"""\
+Check that importing cmake-init stays cheap. Modules that only some commands
+need must not be imported by cmake_init itself, and the best cumulative time
+of importing it reported by `python -X importtime` must stay within a budget.
+The bytecode is cached before measuring, like in the released zipapp.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+source_dir = os.path.join(os.path.dirname(__file__), "..", "cmake-init")
+
+lazy_modules = [
+    "argparse",
+    "cProfile",
+    "concurrent.futures",
+    "gzip",
+    "hashlib",
+    "json",
+    "lzma",
+    "platform",
+    "socket",
+    "socketserver",
+    "struct",
+    "subprocess",
+    "tarfile",
+    "threading",
+    "zipfile",
+    "zlib",
+]
+
+
+def import_cmake_init(pycache_prefix):
+    """Return the cumulative time of importing cmake_init and the modules it
+    imported, not counting the ones the interpreter imported at startup
+    """
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache_prefix)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cmake_init"],
+        cwd=source_dir,
+        env=env,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    # Modules are listed after the ones they import, indented by 2 spaces for
+    # each level of nesting
+    modules = []
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        if name.startswith("   "):
+            modules.append(name.strip())
+        elif name.strip() != "cmake_init":
+            modules = []
+        else:
+            return int(cumulative) / 1000, modules
+    raise RuntimeError(f"cmake_init was not imported:\n{result.stderr}")
+
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__)
+    p.add_argument(
+        "--budget",
+        metavar="ms",
+        type=float,
+        default=25,
+        help="maximum time importing cmake_init may take (default: 25)",
+    )
+    p.add_argument(
+        "--runs",
+        metavar="N",
+        type=int,
+        default=5,
+        help="number of runs to take the best time of (default: 5)",
+    )
+    args = p.parse_args()
+
+    with tempfile.TemporaryDirectory() as pycache_prefix:
+        import_cmake_init(pycache_prefix)
+        runs = [import_cmake_init(pycache_prefix) for _ in range(args.runs)]
+
+    failed = False
+    eager = sorted(set(lazy_modules).intersection(runs[0][1]))
+    if len(eager) != 0:
+        print(f"Imported eagerly: {', '.join(eager)}", file=sys.stderr)
+        failed = True
+    best = min(duration for duration, _ in runs)
+    print(f"import cmake_init: {best:.2f} ms (budget: {args.budget:.2f} ms)")
+    if best > args.budget:
+        print("Importing cmake_init is over budget", file=sys.stderr)
+        failed = True
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()